@@ -0,0 +1,292 @@
+"""
+Benchmark de las funciones de traducción de ReportMaker
+Ejecuta translate_to_english, translate_by_sentences, translate_equipment_info
+y translate_and_correct contra un traductor simulado (latencia, jitter,
+errores y truncados configurables) con informes pequeños, medianos y muy
+grandes, y muestra peticiones, bytes enviados y tiempos p50/p95 por sección.
+
+Uso:
+    python benchmark_translation.py
+    python benchmark_translation.py --latency 0.3 --error-rate 0.05 --repeat 5
+    python benchmark_translation.py --json bench.json
+    python benchmark_translation.py --baseline bench.json   # falla si hay regresión
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+
+# La caché persistente del usuario no debe tocarse durante el benchmark
+os.environ.setdefault('REPORTMAKER_CACHE', ':memory:')
+
+import report_maker as rm
+
+
+class FakeTranslator(rm.TranslationBackend):
+    """Traductor simulado: pone el texto en mayúsculas tras una latencia aleatoria."""
+    name = 'fake'
+    for_testing = True
+
+    def __init__(self, latency=0.2, jitter=0.1, error_rate=0.0, truncation_rate=0.0,
+                 seed=1234, remote=True):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.remote = remote
+        self.requests = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text, source='es', target='en'):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += len(text.encode('utf-8'))
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            fails = self._random.random() < self.error_rate
+            truncates = self._random.random() < self.truncation_rate
+
+        time.sleep(delay)
+        if fails:
+            raise RuntimeError("error simulado del proveedor")
+        if truncates:
+            return text[:len(text) // 5]
+        return text.upper()
+
+
+class DisabledGrammar:
+    """Sustituye a LanguageTool para medir solo la traducción."""
+
+    def check(self, text):
+        return None
+
+    def get(self, wait=True):
+        return None
+
+    def health_check(self):
+        return False
+
+    def close(self):
+        pass
+
+
+# ========== INFORMES DE PRUEBA ==========
+
+SENTENCES = [
+    "El equipo se reinicia de forma aleatoria cuando hay varios clientes conectados.",
+    "Tras actualizar a la versión v1.2.5 la interfaz web deja de responder.",
+    "Se observa pérdida de paquetes en la red de invitados.",
+    "El LED de Internet parpadea en rojo durante unos segundos.",
+    "No se puede acceder a la configuración avanzada desde la app.",
+    "El problema ocurre también con la configuración de fábrica.",
+]
+
+EQUIPMENT_LINES = [
+    "Nombre del equipo: Router Fibra", "Modelo: RX-2000", "Número de serie: ABC123456789",
+    "Versión firmware: v1.2.5", "Estado: funcionando", "Wifi 5GHz: activa",
+    "Puerto WAN: configurado", "Control parental: deshabilitado", "Ubicación: salón",
+    "Modo de conexión: PPPoE",
+]
+
+STEPS = [
+    "Encender el equipo y esperar a que arranque",
+    "Conectar un portátil por cable al puerto LAN 1",
+    "Acceder a la interfaz web con el usuario admin",
+    "Activar la red de invitados",
+    "Conectar tres móviles a la red de invitados",
+    "Esperar diez minutos y comprobar el estado",
+]
+
+REPORT_SIZES = {
+    'small': {'equipment': 5, 'description': 3, 'procedure': 4},
+    'medium': {'equipment': 20, 'description': 15, 'procedure': 15},
+    'large': {'equipment': 60, 'description': 120, 'procedure': 200},
+}
+
+
+def build_report(size):
+    """Informe sintético y determinista del tamaño indicado."""
+    counts = REPORT_SIZES[size]
+
+    def take(items, n):
+        # A partir de la primera vuelta se numeran para que no sean idénticas
+        return [items[i] if i < len(items) else f"Caso {i}: {items[i % len(items)]}"
+                for i in range(n)]
+
+    equipment = []
+    for i in range(counts['equipment']):
+        line = EQUIPMENT_LINES[i % len(EQUIPMENT_LINES)]
+        equipment.append(line if i < len(EQUIPMENT_LINES) else f"{line} ({i})")
+
+    return {
+        'summary': "El router se reinicia al conectar varios clientes",
+        'equipment': '\n'.join(equipment),
+        'description': ' '.join(take(SENTENCES, counts['description'])),
+        'procedure': '\n'.join(f"{i}. {step}" for i, step in
+                               enumerate(take(STEPS, counts['procedure']), 1)),
+        'expected': "El equipo no se reinicia y los clientes siguen conectados.",
+        'logs': '',
+        'attachments': '',
+    }
+
+
+CASES = [
+    ('translate_to_english', 'description', rm.translate_to_english),
+    ('translate_by_sentences', 'description', rm.translate_by_sentences),
+    ('translate_equipment_info', 'equipment', rm.translate_equipment_info),
+    ('translate_and_correct', 'procedure', rm.translate_and_correct),
+]
+
+
+# ========== EJECUCIÓN ==========
+
+def percentile(values, pct):
+    """Percentil por rango más cercano (suficiente para pocas repeticiones)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def reset_state(fake, args):
+    """Caché fría, motor simulado y limitador nuevos para cada medición."""
+    rm.configure_translation_cache(':memory:')
+    rm.grammar_cache.clear()
+    rm.translation_backend = fake
+    rm.rate_limiter = rm.AdaptiveRateLimiter()
+    if not args.grammar:
+        rm.grammar_tool = DisabledGrammar()
+
+
+def measure(func, text, args):
+    fake = FakeTranslator(args.latency, args.jitter, args.error_rate, args.truncation_rate,
+                          seed=args.seed, remote=not args.no_limiter)
+    reset_state(fake, args)
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start, fake.requests, fake.bytes_sent
+
+
+def run_benchmark(args):
+    results = []
+    for size in args.sizes:
+        report = build_report(size)
+        cases = [(name, field, func) for name, field, func in CASES]
+        cases.append(('report OPENED', None,
+                      lambda _text, report=report: rm.generate_report_text('OPENED', report)))
+
+        for name, field, func in cases:
+            text = report[field] if field else ''
+            times, requests, sent = [], [], []
+            for _ in range(args.repeat):
+                elapsed, n_requests, n_bytes = measure(func, text, args)
+                times.append(elapsed)
+                requests.append(n_requests)
+                sent.append(n_bytes)
+            results.append({
+                'size': size,
+                'case': name,
+                'input_chars': len(text) if field else sum(len(v) for v in report.values()),
+                'requests': sum(requests) / len(requests),
+                'bytes_sent': sum(sent) / len(sent),
+                'wall_total': sum(times),
+                'p50': percentile(times, 50),
+                'p95': percentile(times, 95),
+            })
+            print(f"  ✔ {size:<7} {name}")
+    return results
+
+
+def format_table(results):
+    header = (f"{'tamaño':<8}{'caso':<27}{'chars':>8}{'peticiones':>12}"
+              f"{'bytes':>10}{'p50 (s)':>10}{'p95 (s)':>10}")
+    lines = [header, '-' * len(header)]
+    for row in results:
+        lines.append(f"{row['size']:<8}{row['case']:<27}{row['input_chars']:>8}"
+                     f"{row['requests']:>12.1f}{row['bytes_sent']:>10.0f}"
+                     f"{row['p50']:>10.3f}{row['p95']:>10.3f}")
+    return '\n'.join(lines)
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    """Devuelve la lista de regresiones en peticiones o p95 respecto a la referencia."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(row['size'], row['case']): row for row in json.load(f)['results']}
+
+    regressions = []
+    for row in results:
+        ref = baseline.get((row['size'], row['case']))
+        if not ref:
+            continue
+        for metric in ('requests', 'p95'):
+            if ref[metric] and row[metric] > ref[metric] * (1 + tolerance):
+                regressions.append(f"{row['size']} / {row['case']}: {metric} "
+                                   f"{ref[metric]:.3f} -> {row[metric]:.3f}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de traducción con proveedor simulado")
+    parser.add_argument('--latency', type=float, default=0.2, help="Latencia media por petición (s)")
+    parser.add_argument('--jitter', type=float, default=0.1, help="Variación de la latencia (± s)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probabilidad de error (0-1)")
+    parser.add_argument('--truncation-rate', type=float, default=0.0,
+                        help="Probabilidad de respuesta truncada (0-1)")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por caso")
+    parser.add_argument('--sizes', nargs='+', choices=list(REPORT_SIZES), default=list(REPORT_SIZES))
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--no-limiter', action='store_true',
+                        help="No pasar las peticiones por el limitador de ritmo")
+    parser.add_argument('--grammar', action='store_true',
+                        help="Incluir la corrección con LanguageTool (por defecto desactivada)")
+    parser.add_argument('--output', metavar='FICHERO', help="Guardar también la tabla en un fichero")
+    parser.add_argument('--json', metavar='FICHERO', help="Guardar los resultados en JSON")
+    parser.add_argument('--baseline', metavar='FICHERO',
+                        help="JSON de una ejecución anterior para detectar regresiones")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Margen permitido frente a la referencia (0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 70)
+    print("⏱️ BENCHMARK DE TRADUCCIÓN (proveedor simulado)")
+    print("=" * 70)
+    print(f"   latencia {args.latency}s ± {args.jitter}s, errores {args.error_rate:.0%}, "
+          f"truncados {args.truncation_rate:.0%}, {args.repeat} repeticiones\n")
+
+    results = run_benchmark(args)
+    table = format_table(results)
+    print("\n" + table + "\n")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(table + '\n')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'settings': vars(args), 'results': results}, f, indent=2)
+        print(f"💾 Resultados guardados en {args.json}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print("❌ Regresiones respecto a la referencia:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print("✅ Sin regresiones respecto a la referencia")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,7 +29,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['requests', 'docx', 'tkinter', 'PIL'],
+    hiddenimports=['requests', 'docx', 'tkinter', 'PIL', 'deep_translator', 'language_tool_python'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
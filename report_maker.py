@@ -1,199 +1,2484 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 from datetime import datetime
-from docx import Document
-from docx.shared import Pt, RGBColor
 import re
-from deep_translator import GoogleTranslator
-import language_tool_python
-import time
+import os
+import atexit
+import hashlib
+import sqlite3
+import threading
+import contextvars
+import queue
+import sys
+import json
+import argparse
+import random
+import urllib.request
+from collections import OrderedDict, deque
+from contextlib import contextmanager, redirect_stdout
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# ========== IMPORTACIÓN DIFERIDA ==========
+# docx, deep_translator y language_tool_python tardan en importarse (sobre
+# todo dentro del .exe de PyInstaller), así que se cargan al usarse por
+# primera vez o en el hilo de precarga que arranca tras mostrar la ventana.
+
+_startup_marks = []   # (etapa, segundos desde el arranque)
+_import_times = {}    # paquete -> segundos de su primera importación
+
+
+def mark_startup(stage):
+    """Registra el momento en que se alcanza una etapa del arranque."""
+    _startup_marks.append((stage, time.perf_counter() - _STARTUP_T0))
+
+
+@contextmanager
+def _timed_import(name):
+    already_loaded = name in sys.modules
+    start = time.perf_counter()
+    yield
+    if not already_loaded:
+        _import_times.setdefault(name, time.perf_counter() - start)
+
+
+def load_translator_class():
+    with _timed_import('deep_translator'):
+        from deep_translator import GoogleTranslator
+    return GoogleTranslator
+
+
+def load_language_tool():
+    with _timed_import('language_tool_python'):
+        import language_tool_python
+    return language_tool_python
+
+
+def load_docx():
+    """Devuelve (Document, Pt, RGBColor) de python-docx."""
+    with _timed_import('docx'):
+        from docx import Document
+        from docx.shared import Pt, RGBColor
+    return Document, Pt, RGBColor
+
+
+def warm_up_in_background(on_done=None):
+    """Precarga las dependencias pesadas en un hilo para no bloquear la ventana."""
+    def warm_up():
+        for loader in (load_translator_class, load_docx, load_language_tool,
+                       get_translation_backend):
+            try:
+                loader()
+            except Exception as e:
+                print(f"⚠️ Precarga fallida ({loader.__name__}): {e}")
+        mark_startup('precarga completa')
+        # Arranca el servidor de LanguageTool para que el primer informe no lo espere
+        ready = grammar_tool.get() is not None
+        mark_startup('LanguageTool listo' if ready else 'LanguageTool no disponible')
+        if on_done:
+            on_done()
+    
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def format_startup_report():
+    """Informe de arranque al estilo de python -X importtime."""
+    lines = ["⏱️ Informe de arranque"]
+    for stage, seconds in _startup_marks:
+        lines.append(f"  {stage:<22}{seconds * 1000:>10.1f} ms")
+    lines.append("  import time: self [us] | paquete")
+    for name, seconds in sorted(_import_times.items(), key=lambda item: -item[1]):
+        lines.append(f"  import time: {int(seconds * 1e6):>9} | {name}")
+    return '\n'.join(lines)
+
+
+def write_startup_report(destination='-'):
+    report = format_startup_report()
+    if destination == '-':
+        print(report)
+    else:
+        with open(destination, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+
+
+# ========== INSTRUMENTACIÓN ==========
+
+class Tracer:
+    """
+    Registro de tiempos por etapa (spans) y contadores de la generación de
+    informes. Se puede ver en el panel de diagnóstico y exportar a JSON o al
+    formato Chrome trace (chrome://tracing, ui.perfetto.dev).
+    """
+    MAX_EVENTS = 20000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._events = []
+            self._counters = {}
+            self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, **args):
+        """Mide un bloque; se pueden añadir datos al dict que devuelve (p. ej. el resultado)."""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add_span(name, start, time.perf_counter(), **args)
+
+    def add_span(self, name, start, end, **args):
+        event = {'name': name, 'start': start - self._t0, 'duration': end - start,
+                 'thread': threading.current_thread().name, 'args': args}
+        with self._lock:
+            if len(self._events) < self.MAX_EVENTS:
+                self._events.append(event)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def summary(self):
+        """Agrega los spans por nombre: [(nombre, llamadas, total_s, máx_s)] de mayor a menor."""
+        totals = {}
+        for event in self.events():
+            calls, total, longest = totals.get(event['name'], (0, 0.0, 0.0))
+            totals[event['name']] = (calls + 1, total + event['duration'],
+                                     max(longest, event['duration']))
+        return sorted(((name,) + values for name, values in totals.items()),
+                      key=lambda row: -row[2])
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'events': self.events(), 'counters': self.counters()}, f,
+                      indent=2, ensure_ascii=False, default=str)
+
+    def export_chrome_trace(self, path):
+        threads = {}
+        trace_events = []
+        for event in self.events():
+            tid = threads.setdefault(event['thread'], len(threads) + 1)
+            trace_events.append({
+                'name': event['name'], 'cat': event['name'].split('.')[0], 'ph': 'X',
+                'ts': round(event['start'] * 1e6), 'dur': round(event['duration'] * 1e6),
+                'pid': 1, 'tid': tid,
+                'args': {key: str(value) for key, value in event['args'].items()},
+            })
+        for thread_name, tid in threads.items():
+            trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                                 'args': {'name': thread_name}})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'otherData': self.counters()}, f)
+
+
+tracer = Tracer()
+
+
+# Máximo de peticiones simultáneas al traductor (límite del proveedor)
+TRANSLATION_MAX_IN_FLIGHT = int(os.environ.get('REPORTMAKER_MAX_IN_FLIGHT', '4'))
+
+_in_flight = threading.BoundedSemaphore(TRANSLATION_MAX_IN_FLIGHT)
+
+
+def set_max_in_flight(limit):
+    """Cambia el número máximo de peticiones de traducción en vuelo."""
+    global TRANSLATION_MAX_IN_FLIGHT, _in_flight
+    TRANSLATION_MAX_IN_FLIGHT = max(1, int(limit))
+    _in_flight = threading.BoundedSemaphore(TRANSLATION_MAX_IN_FLIGHT)
+
+
+# ========== GLOSARIO ==========
+
+# Terminología de equipos español -> inglés. El usuario puede ampliarla o
+# corregirla con un JSON con las mismas tres secciones (ver README).
+DEFAULT_GLOSSARY = {
+    # Etiquetas de Equipment Information ("Etiqueta: valor")
+    'labels': {
+        'nombre del equipo': 'Equipment', 'nombre': 'Equipment', 'equipo': 'Equipment',
+        'modelo': 'Model', 'número de serie': 'Serial Number', 'serial': 'Serial Number',
+        'versión hardware': 'Hardware Version', 'versión software': 'Software Version',
+        'versión firmware': 'Firmware Version', 'versión de firmware': 'Firmware Version',
+        'código de país': 'Country Code', 'product id': 'Product ID',
+        'estado': 'State', 'versión': 'Version', 'fabricante': 'Manufacturer',
+        'dirección ip': 'IP Address', 'dirección mac': 'MAC Address', 'ubicación': 'Location',
+        'modo de conexión': 'Connection Mode', 'tipo de conexión': 'Connection Type',
+        'puerto wan': 'WAN Port', 'puerto lan': 'LAN Port', 'puerto': 'Port',
+        'control parental': 'Parental Control', 'red de invitados': 'Guest Network',
+        'usuario': 'User', 'contraseña': 'Password', 'canal': 'Channel', 'banda': 'Band',
+        'señal': 'Signal', 'potencia': 'Power', 'temperatura': 'Temperature',
+        'operador': 'Operator', 'cliente': 'Customer', 'fecha': 'Date',
+        'tiempo de actividad': 'Uptime', 'memoria': 'Memory',
+        'mac': 'MAC', 'ip': 'IP', 'ssid': 'SSID', 'wifi': 'WiFi',
+        'wifi 2.4ghz': 'WiFi 2.4GHz', 'wifi 5ghz': 'WiFi 5GHz',
+    },
+    # Valores de estado
+    'values': {
+        'configurado': 'configured', 'configurada': 'configured',
+        'activa': 'active', 'activo': 'active',
+        'activado': 'enabled', 'activada': 'enabled',
+        'desactivado': 'disabled', 'desactivada': 'disabled',
+        'habilitado': 'enabled', 'habilitada': 'enabled',
+        'deshabilitado': 'disabled', 'deshabilitada': 'disabled',
+        'funcionando': 'working', 'conectado': 'connected', 'conectada': 'connected',
+        'desconectado': 'disconnected', 'desconectada': 'disconnected',
+        'encendido': 'on', 'encendida': 'on', 'apagado': 'off', 'apagada': 'off',
+        'sí': 'yes', 'no': 'no', 'correcto': 'OK', 'incorrecto': 'incorrect',
+        'pendiente': 'pending', 'desconocido': 'unknown', 'ninguno': 'none',
+        'automático': 'automatic', 'manual': 'manual',
+        'estable': 'stable', 'inestable': 'unstable',
+        'parpadeando': 'blinking', 'fijo': 'solid',
+        'rojo': 'red', 'verde': 'green', 'naranja': 'orange', 'azul': 'blue', 'blanco': 'white',
+    },
+    # Frases frecuentes en valores y líneas sueltas
+    'phrases': {
+        'no responde': 'not responding', 'sin conexión': 'no connection',
+        'sin señal': 'no signal', 'sin acceso': 'no access',
+        'valores de fábrica': 'factory defaults', 'configuración de fábrica': 'factory settings',
+        'se reinicia': 'reboots', 'no funciona': 'not working',
+    },
+}
+
+GLOSSARY_SECTIONS = ('labels', 'values', 'phrases')
+
+
+def default_glossary_path():
+    path = os.environ.get('REPORTMAKER_GLOSSARY')
+    if path:
+        return path
+    return os.path.join(os.path.expanduser('~'), '.reportmaker', 'glossary.json')
+
+
+def _glossary_key(term):
+    return ' '.join(term.lower().split()).rstrip(':.')
+
+
+class GlossaryMatcher:
+    """
+    Autómata de Aho–Corasick sobre los términos del glosario (en minúsculas).
+    Encuentra todos los términos de un texto en una sola pasada.
+    """
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # longitudes de los términos que terminan en cada estado
+        
+        for term in terms:
+            state = 0
+            for char in term:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(len(term))
+        
+        # Enlaces de fallo por anchura (los hijos de la raíz fallan a la raíz)
+        order = list(self.goto[0].values())
+        for state in order:
+            for char, child in self.goto[state].items():
+                order.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """
+        Devuelve (inicio, fin) de los términos que aparecen como palabras
+        completas, sin solaparse y prefiriendo el más largo de la izquierda.
+        """
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            return []
+        
+        found = []
+        state = 0
+        for i, char in enumerate(lowered):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length in self.output[state]:
+                start, end = i + 1 - length, i + 1
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == len(text) or not text[end].isalnum()):
+                    found.append((start, end))
+        
+        found.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        last_end = 0
+        for start, end in found:
+            if start >= last_end:
+                matches.append((start, end))
+                last_end = end
+        return matches
+
+
+class Glossary:
+    """Glosario compilado: búsqueda exacta de etiquetas y autómata para el resto."""
+
+    def __init__(self, entries=None):
+        entries = entries or DEFAULT_GLOSSARY
+        self.labels = {_glossary_key(k): v for k, v in entries.get('labels', {}).items()}
+        self.values = {_glossary_key(k): v for k, v in entries.get('values', {}).items()}
+        self.phrases = {_glossary_key(k): v for k, v in entries.get('phrases', {}).items()}
+        # Si un término está en varias secciones, en texto libre gana su valor
+        self.terms = {**self.labels, **self.phrases, **self.values}
+        self.matcher = GlossaryMatcher(self.terms)
+        # Para detectar valores traducibles no sirven las etiquetas ("IP", "equipo"...)
+        self.value_matcher = GlossaryMatcher({**self.phrases, **self.values})
+
+    def __len__(self):
+        return len(self.terms)
+
+    def label(self, field):
+        """Traducción de una etiqueta de Equipment Information, o None."""
+        return self.labels.get(_glossary_key(field))
+
+    def mentions(self, text):
+        """Indica si el texto contiene algún valor o frase del glosario (no etiquetas)."""
+        return bool(self.value_matcher.find(text))
+
+    def translate_offline(self, text):
+        """
+        Traduce text solo con el glosario si todas sus palabras están en él
+        (lo demás son números, signos o marcadores ⟦n⟧). Si no, devuelve None.
+        """
+        result = []
+        position = 0
+        for start, end in self.matcher.find(text):
+            if has_words(text[position:start]):
+                return None
+            term = text[start:end]
+            translated = self.terms[_glossary_key(term)]
+            if term[:1].isupper() and translated[:1].islower():
+                translated = translated[:1].upper() + translated[1:]
+            result.append(text[position:start])
+            result.append(translated)
+            position = end
+        if has_words(text[position:]):
+            return None
+        result.append(text[position:])
+        return ''.join(result)
+
+
+def load_glossary(path=None):
+    """
+    Glosario por defecto ampliado con el JSON del usuario
+    ({"labels": {...}, "values": {...}, "phrases": {...}}), si existe.
+    """
+    path = path or default_glossary_path()
+    entries = {section: dict(terms) for section, terms in DEFAULT_GLOSSARY.items()}
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                user_entries = json.load(f)
+            for section in GLOSSARY_SECTIONS:
+                entries[section].update(user_entries.get(section, {}))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"⚠️ Glosario {path} no válido, usando el glosario por defecto: {e}")
+    return Glossary(entries)
+
+
+glossary = None
+_glossary_state = None
+_glossary_lock = threading.Lock()
+
+
+def get_glossary():
+    """
+    Devuelve el glosario compilado. Se vuelve a compilar solo si el fichero
+    del usuario ha cambiado desde la última vez (se puede editar en marcha).
+    """
+    global glossary, _glossary_state
+    path = default_glossary_path()
+    try:
+        state = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        state = (path, None)
+    with _glossary_lock:
+        if glossary is None or state != _glossary_state:
+            glossary = load_glossary(path)
+            _glossary_state = state
+        return glossary
+
+
+# ========== MOTORES DE TRADUCCIÓN ==========
+
+class TranslationUnavailable(Exception):
+    """El motor no puede traducir este texto (se prueba con el siguiente)."""
+
+
+class TranslationBackend:
+    """
+    Interfaz común de los motores de traducción.
+    remote indica si el motor es un servicio externo con límites de uso;
+    for_testing, si sus traducciones no deben guardarse en la caché persistente;
+    max_chars, el texto más largo que acepta en una petición.
+    """
+    name = 'base'
+    remote = True
+    for_testing = False
+    # GoogleTranslator rechaza textos de más de 5000 caracteres
+    max_chars = 5000
+
+    def translate(self, text, source='es', target='en'):
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate a través de deep_translator (motor por defecto)."""
+    name = 'google'
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _translator(self, source, target):
+        # GoogleTranslator guarda los parámetros de la petición en la
+        # instancia, así que cada hilo necesita la suya
+        translators = getattr(self._local, 'translators', None)
+        if translators is None:
+            translators = self._local.translators = {}
+        if (source, target) not in translators:
+            GoogleTranslator = load_translator_class()
+            translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translators[(source, target)]
+
+    def translate(self, text, source='es', target='en'):
+        return self._translator(source, target).translate(text)
+
+
+class PhraseTableBackend(TranslationBackend):
+    """
+    Motor offline basado en el glosario (etiquetas, estados y frases de
+    equipos). Traduce línea a línea y solo si todas las líneas están
+    cubiertas por el glosario; si no, deja paso al siguiente motor.
+    """
+    name = 'phrases'
+    remote = False
+
+    def __init__(self, glossary=None):
+        self.glossary = glossary
+
+    def translate(self, text, source='es', target='en'):
+        if (source, target) != ('es', 'en'):
+            raise TranslationUnavailable("solo es -> en")
+        glossary = self.glossary or get_glossary()
+        result = []
+        for line in text.split('\n'):
+            translated = glossary.translate_offline(line)
+            if translated is None:
+                raise TranslationUnavailable(f"frase desconocida: {line.strip()[:40]}")
+            result.append(translated)
+        return '\n'.join(result)
+
+
+class LibreTranslateBackend(TranslationBackend):
+    """
+    Servidor de traducción local compatible con la API de LibreTranslate
+    (motor offline en CPU). URL configurable con REPORTMAKER_LIBRE_URL.
+    """
+    name = 'libre'
+    remote = False
+
+    def __init__(self, url=None, timeout=30):
+        self.url = (url or os.environ.get('REPORTMAKER_LIBRE_URL', 'http://127.0.0.1:5000')).rstrip('/')
+        self.timeout = timeout
+
+    def translate(self, text, source='es', target='en'):
+        payload = json.dumps({'q': text, 'source': source, 'target': target,
+                              'format': 'text'}).encode('utf-8')
+        request = urllib.request.Request(f"{self.url}/translate", data=payload,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            raise TranslationUnavailable(f"{self.url}: {e}")
+        if 'translatedText' not in data:
+            raise TranslationUnavailable(data.get('error', 'respuesta sin translatedText'))
+        return data['translatedText']
+
+
+class StubTranslationServer:
+    """
+    Servidor HTTP local y determinista con la API de LibreTranslate, para
+    pruebas sin red: antepone "[<destino>] " a cada línea del texto.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.requests = 0
+        self._server = None
+
+    @staticmethod
+    def fake_translate(text, target='en'):
+        return '\n'.join(f"[{target}] {line}" if line.strip() else line
+                         for line in text.split('\n'))
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                data = json.loads(self.rfile.read(length).decode('utf-8'))
+                stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps({'translatedText': stub.fake_translate(
+                    data.get('q', ''), data.get('target', 'en'))}).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='stub-translator',
+                         daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class StubBackend(LibreTranslateBackend):
+    """Arranca un StubTranslationServer propio y lo usa como motor."""
+    name = 'stub'
+    for_testing = True
+
+    def __init__(self, latency=0.0):
+        self.server = StubTranslationServer(latency=latency).start()
+        super().__init__(self.server.url)
+
+
+class BackendChain(TranslationBackend):
+    """Prueba los motores en orden y pasa al siguiente cuando uno falla."""
+    name = 'chain'
+    # El límite de ritmo se aplica a cada motor remoto de la cadena, no a la cadena
+    remote = False
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+        self.for_testing = any(backend.for_testing for backend in self.backends)
+        self.max_chars = min(backend.max_chars for backend in self.backends)
+
+    def translate(self, text, source='es', target='en', validate=None):
+        errors = []
+        for backend in self.backends:
+            try:
+                return _rate_limited_translate(backend, text, source, target, validate)
+            except Exception as e:
+                errors.append(f"{backend.name}: {e}")
+        raise TranslationUnavailable('; '.join(errors))
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket compartido por todas las llamadas a motores remotos.
+    La tasa sube poco a poco mientras las respuestas son buenas y se reduce
+    ante errores o traducciones truncadas (AIMD). Tras cada fallo seguido se
+    bloquean las peticiones durante una espera exponencial con jitter.
+    """
+
+    def __init__(self, rate=5.0, burst=8, min_rate=0.2, max_rate=20.0, increase=0.5,
+                 base_delay=0.5, max_delay=30.0):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.requests = 0
+        self.errors = 0
+        self.truncated = 0
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._failures = 0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Espera hasta que haya un token y no haya una espera por fallos en curso."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self.requests += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+            with tracer.span('ratelimit.wait', seconds=round(wait, 3)):
+                time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            self._failures = 0
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_error(self):
+        with self._lock:
+            self.errors += 1
+            self._penalize(0.7)
+
+    def on_truncated(self):
+        with self._lock:
+            self.truncated += 1
+            self._penalize(0.85)
+
+    def _penalize(self, factor):
+        self._failures += 1
+        self.rate = max(self.min_rate, self.rate * factor)
+        delay = min(self.max_delay, self.base_delay * 2 ** (self._failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+    def stats(self):
+        with self._lock:
+            return {'rate': round(self.rate, 2), 'requests': self.requests,
+                    'errors': self.errors, 'truncated': self.truncated,
+                    'waited': round(self.waited, 2)}
+
+
+rate_limiter = AdaptiveRateLimiter(
+    rate=float(os.environ.get('REPORTMAKER_RATE', '5')),
+    max_rate=float(os.environ.get('REPORTMAKER_MAX_RATE', '20')))
+
+
+def _rate_limited_translate(backend, text, source='es', target='en', validate=None):
+    """
+    Traduce con un motor; si es remoto, pasa por el limitador y le informa del
+    resultado una sola vez: error, truncado (validate(traducción) es falso) o bueno.
+    """
+    if not backend.remote:
+        if isinstance(backend, BackendChain):
+            return backend.translate(text, source, target, validate)
+        return backend.translate(text, source, target)
+    
+    rate_limiter.acquire()
+    try:
+        translated = backend.translate(text, source, target)
+    except Exception:
+        rate_limiter.on_error()
+        raise
+    if validate is not None and not validate(translated):
+        rate_limiter.on_truncated()
+    else:
+        rate_limiter.on_success()
+    return translated
+
+
+def not_truncated(text):
+    """Validación de _provider_translate: la traducción no es mucho más corta que text."""
+    return lambda translated: len(translated or '') >= len(text) * 0.3
+
+
+TRANSLATION_BACKENDS = {
+    'google': GoogleBackend,
+    'phrases': PhraseTableBackend,
+    'libre': LibreTranslateBackend,
+    'stub': StubBackend,
+}
+
+translation_backend = None
+_backend_lock = threading.Lock()
+
+
+def configure_translation_backends(names=None):
+    """
+    Elige los motores de traducción para esta ejecución, en orden de
+    preferencia (p. ej. "phrases,libre,google"). Por defecto se usa
+    REPORTMAKER_BACKENDS o solo "google".
+    """
+    global translation_backend
+    if names is None:
+        names = os.environ.get('REPORTMAKER_BACKENDS', 'google')
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(',') if name.strip()]
+    unknown = [name for name in names if name not in TRANSLATION_BACKENDS]
+    if unknown or not names:
+        raise ValueError(f"Motor de traducción desconocido: {', '.join(unknown) or '(vacío)'} "
+                         f"(disponibles: {', '.join(TRANSLATION_BACKENDS)})")
+    
+    backends = [TRANSLATION_BACKENDS[name]() for name in names]
+    translation_backend = backends[0] if len(backends) == 1 else BackendChain(backends)
+    
+    if translation_backend.for_testing and translation_cache.path != ':memory:':
+        # Las traducciones de prueba no deben quedarse en la caché real
+        print("ℹ️ Motor de pruebas: usando caché de traducciones en memoria")
+        configure_translation_cache(':memory:')
+    return translation_backend
+
+
+def get_translation_backend():
+    if translation_backend is None:
+        with _backend_lock:
+            if translation_backend is None:
+                configure_translation_backends()
+    return translation_backend
+
+
+def _provider_translate(text, source='es', target='en', validate=None):
+    """Llamada al motor de traducción respetando el límite de peticiones en vuelo."""
+    with _in_flight:
+        return _rate_limited_translate(get_translation_backend(), text, source, target, validate)
+
+
+TRANSLATION_CACHE_MAX_ENTRIES = 20000
+
+
+def default_translation_cache_path():
+    """Ruta de la caché de traducciones (se puede cambiar con REPORTMAKER_CACHE)."""
+    custom_path = os.environ.get('REPORTMAKER_CACHE')
+    if custom_path:
+        return custom_path
+    return os.path.join(os.path.expanduser('~'), '.reportmaker', 'translation_cache.sqlite3')
+
+
+class TranslationCache:
+    """
+    Caché persistente de traducciones direccionada por contenido.
+    La clave es un hash de idioma origen, idioma destino y texto normalizado.
+    Al superar max_entries se expulsan las entradas usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, path=None, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+        self.path = path or default_translation_cache_path()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Últimos accesos aún sin guardar (clave -> instante): se escriben junto con
+        # put() o close() para que una lectura nunca deje abierta una transacción
+        # que bloquee a otro proceso con la misma caché
+        self._touched = {}
+        self._conn = self._connect()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        atexit.register(self.close)
+
+    def _connect(self):
+        if self.path != ':memory:':
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                return self._open(self.path)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Caché en disco no disponible ({e}), usando memoria", file=sys.stderr)
+        self.path = ':memory:'
+        return self._open(':memory:')
+
+    @staticmethod
+    def _open(path):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS translations ("
+                     "key TEXT PRIMARY KEY, translation TEXT NOT NULL, last_used REAL NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_last_used "
+                     "ON translations (last_used)")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def normalize(text):
+        """Quita espacios sobrantes conservando los saltos de línea."""
+        return '\n'.join(' '.join(line.split()) for line in text.strip().split('\n'))
+
+    @classmethod
+    def make_key(cls, text, source='es', target='en'):
+        raw = f"{source}\x00{target}\x00{cls.normalize(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, text, source='es', target='en'):
+        """Traducción guardada o None; un fallo de la caché cuenta como fallo de caché."""
+        key = self.make_key(text, source, target)
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                print(f"⚠️ Error leyendo la caché de traducciones: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                tracer.count('cache.miss')
+                return None
+            self.hits += 1
+            tracer.count('cache.hit')
+            self._touched[key] = time.time()
+            return row[0]
+
+    def put(self, text, translation, source='es', target='en'):
+        """Guarda una traducción; si la caché falla se avisa y se sigue sin ella."""
+        key = self.make_key(text, source, target)
+        with self._lock:
+            try:
+                self._flush_touched()
+                cursor = self._conn.execute(
+                    "UPDATE translations SET translation = ?, last_used = ? WHERE key = ?",
+                    (translation, time.time(), key))
+                if cursor.rowcount == 0:
+                    self._conn.execute(
+                        "INSERT INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                        (key, translation, time.time()))
+                    self._count += 1
+                if self._count > self.max_entries:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️ Error guardando en la caché de traducciones: {e}")
+                try:
+                    self._conn.rollback()
+                except sqlite3.Error:
+                    pass
+
+    def _flush_touched(self):
+        # Se llama con el lock tomado y dentro de la transacción de quien escribe
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE translations SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        # Expulsar un 10% extra para no tener que expulsar en cada inserción
+        excess = self._count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN "
+            "(SELECT key FROM translations ORDER BY last_used LIMIT ?)", (excess,))
+        self._count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': self._count, 'path': self.path}
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush_touched()
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
+translation_cache = TranslationCache()
+
+
+def configure_translation_cache(path=None, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+    """Sustituye la caché global, p. ej. para usar otra ubicación o ':memory:'."""
+    global translation_cache
+    translation_cache.close()
+    translation_cache = TranslationCache(path, max_entries)
+    return translation_cache
+
+class LanguageToolManager:
+    """
+    Ciclo de vida del corrector LanguageTool: se arranca en segundo plano al
+    abrir la aplicación, se reutiliza la misma instancia en todos los informes
+    y se cierra al salir. Si el arranque falla se reintenta con espera
+    exponencial en lugar de en cada llamada. Con REPORTMAKER_LT_SERVER
+    (p. ej. http://localhost:8081) se usa un servidor LanguageTool ya arrancado.
+    """
+    RETRY_BASE_DELAY = 5.0
+    RETRY_MAX_DELAY = 300.0
+
+    def __init__(self, language='en-US', remote_server=None):
+        self.language = language
+        self.remote_server = remote_server or os.environ.get('REPORTMAKER_LT_SERVER') or None
+        self.last_error = None
+        self._tool = None
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._next_attempt = 0.0
+
+    def get(self, wait=True):
+        """
+        Devuelve la instancia lista o None si no está disponible.
+        Si el arranque está en curso espera a que termine (o no, con wait=False).
+        """
+        if self._tool is not None:
+            return self._tool
+        if not self._lock.acquire(blocking=wait):
+            return None
+        try:
+            if self._tool is None and time.monotonic() >= self._next_attempt:
+                self._start()
+            return self._tool
+        finally:
+            self._lock.release()
+
+    def _start(self):
+        try:
+            language_tool_python = load_language_tool()
+            if self.remote_server:
+                tool = language_tool_python.LanguageTool(self.language,
+                                                         remote_server=self.remote_server)
+            else:
+                tool = language_tool_python.LanguageTool(self.language)
+            tool.check("This is a health check.")
+        except Exception as e:
+            self._schedule_retry(e)
+            return
+        self._tool = tool
+        self._failures = 0
+        self.last_error = None
+
+    def _schedule_retry(self, error):
+        self._failures += 1
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** (self._failures - 1))
+        self._next_attempt = time.monotonic() + delay
+        self.last_error = error
+        print(f"⚠️ LanguageTool no disponible ({error}), reintento en {delay:.0f} s")
+
+    def health_check(self):
+        """
+        Comprueba que el servidor responde; si no, lo descarta para reiniciarlo.
+        Se llama al empezar cada informe para no descubrir en la primera
+        corrección que el servidor (propio o externo) ya no está.
+        """
+        tool = self._tool
+        if tool is None:
+            return False
+        try:
+            tool.check("Health check.")
+            return True
+        except Exception as e:
+            self._discard(tool, e)
+            return False
+
+    def check(self, text):
+        """Devuelve las correcciones de text, o None si el corrector no está disponible."""
+        tool = self.get()
+        if tool is None:
+            return None
+        try:
+            return tool.check(text)
+        except Exception as e:
+            self._discard(tool, e)
+            return None
+
+    def _discard(self, tool, error):
+        with self._lock:
+            if self._tool is tool:
+                self._tool = None
+                self._schedule_retry(error)
+        try:
+            tool.close()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            tool, self._tool = self._tool, None
+        if tool is not None:
+            try:
+                tool.close()
+            except Exception:
+                pass
+
+
+grammar_tool = LanguageToolManager('en-US')
+atexit.register(grammar_tool.close)
+
+
+def init_language_tool():
+    return grammar_tool.get()
+
+# ========== SEGMENTACIÓN ==========
+
+# Abreviaturas (en minúsculas y sin el punto final) tras las que el punto no cierra la oración
+ABBREVIATIONS = frozenset({
+    'aprox', 'approx', 'etc', 'ej', 'p.ej', 'p. ej', 'e.g', 'i.e', 'vs', 'cf',
+    'sr', 'sra', 'srta', 'dr', 'dra', 'ud', 'uds', 'mr', 'mrs', 'ms',
+    'núm', 'nº', 'pág', 'págs', 'fig', 'tel', 'art', 'av', 'pto', 'dpto', 'dept',
+    'máx', 'mín', 'max', 'min', 'seg', 'hr', 'hrs', 'inc', 'ltd', 'corp',
+})
+
+# Signos que cierran una oración, seguidos opcionalmente de comillas o paréntesis
+_SENTENCE_END = re.compile(r'([.!?…]+)["\'”»)\]]*$')
+
+
+def _ends_sentence(token, first_in_line, next_char):
+    """Indica si la palabra token cierra la oración (cuando le sigue un espacio)."""
+    end = _SENTENCE_END.search(token)
+    if not end:
+        return False
+    if '!' in end.group(1) or '?' in end.group(1):
+        return True
+    
+    # Punto o puntos suspensivos: se descartan los casos en que no cierra
+    if next_char.islower():
+        return False
+    word = token[:end.start()].lstrip('(¿¡"\'“«[').lower()
+    if word in ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+        return False
+    # Número de un paso al principio de la línea ("1. Encender el equipo")
+    if first_in_line and word.isdigit():
+        return False
+    return True
+
+
+def split_sentences(text):
+    """
+    Divide el texto en oraciones conservando los separadores exactos.
+    Devuelve [oración, separador, oración, ..., oración], igual que re.split
+    con un grupo: oraciones en los índices pares y separadores en los impares.
+    Un salto de línea siempre separa. Un punto seguido de espacio separa salvo
+    en abreviaturas, iniciales, números de paso ("1. ...") o si la siguiente
+    palabra empieza en minúscula; los puntos sin espacio detrás (v1.2.5,
+    192.168.1.1, 3.5) nunca separan.
+    """
+    return list(_split_sentences(text))
+
+
+# El análisis del texto original se comparte entre idiomas y entre informes
+@lru_cache(maxsize=1024)
+def _split_sentences(text):
+    pieces = []
+    sentence_start = 0
+    token_start = 0
+    first_in_line = True
+    for match in re.finditer(r'\s+', text):
+        start, end = match.span()
+        separator = match.group()
+        token = text[token_start:start]
+        if '\n' in separator or _ends_sentence(token, first_in_line, text[end:end + 1]):
+            pieces.append(text[sentence_start:start])
+            pieces.append(separator)
+            sentence_start = end
+        first_in_line = '\n' in separator
+        token_start = end
+    pieces.append(text[sentence_start:])
+    return tuple(pieces)
+
+
+def pack_sentences(pieces, max_chars, keep=None, first_chars=None):
+    """
+    Agrupa oraciones enteras de split_sentences() en trozos de hasta max_chars
+    (una oración más larga que el límite va sola). Devuelve una lista de
+    (trozo, separador que lo sigue en el texto original, hay_que_traducir).
+    Las oraciones para las que keep(oración) es cierto no se traducen: cortan
+    el trozo actual y van en uno propio. Con first_chars el primer trozo es
+    de ese tamaño y cada uno dobla al anterior hasta llegar a max_chars.
+    """
+    chunks = []
+    limit = min(first_chars or max_chars, max_chars)
+    current = ''
+    current_kept = False
+    pending_separator = ''
+    for i in range(0, len(pieces), 2):
+        sentence = pieces[i]
+        kept = keep is not None and keep(sentence)
+        if current and (kept != current_kept or
+                        len(current) + len(pending_separator) + len(sentence) > limit):
+            chunks.append((current, pending_separator, not current_kept))
+            current = ''
+            limit = min(limit * 2, max_chars)
+        current = current + pending_separator + sentence if current else sentence
+        current_kept = kept
+        pending_separator = pieces[i + 1] if i + 1 < len(pieces) else ''
+    if current:
+        chunks.append((current, pending_separator, not current_kept))
+    return chunks
+
+
+# ========== DETECCIÓN DE IDIOMA ==========
+
+# Palabras que solo aparecen en uno de los dos idiomas (las ambiguas, como
+# "no", "a", "me", "error" o "red", no están en ninguna de las dos listas)
+_SPANISH_WORDS = frozenset("""
+    de la que el en y los se del las un por con una su para es al lo como más
+    pero sus le ya este porque esta entre cuando muy sin sobre también hasta
+    hay donde desde todo nos durante todos uno les ni contra otros ese eso ante
+    ellos esto antes algunos qué unos otro otras otra él tanto esa estos mucho
+    nada muchos cual poco ella estar estas algunas algo tras está están son fue
+    ser tiene hace puede después luego equipo usted cada vez veces solo
+""".split())
+
+_ENGLISH_WORDS = frozenset("""
+    the and of to is it that for on with as was be by this are not or at from
+    but have an they which you were has had all when after before can could
+    does did doesn't don't isn't can't won't should will would there their if
+    into then than also been being its our we she his her them these those
+    what who how why where while about over under between through only just
+    some any each other more most very same such both few many much again once
+    here out up down off yes ok enabled disabled connected disconnected active
+    inactive running working failed failure errors warning success successful
+    online offline default unknown none link lost timeout reboot reboots
+    rebooted restart restarted crash crashed issue issues fixed fix bug bugs
+    update updated upgrade device devices port ports network wireless signal
+    connection settings setting firmware release notes support supported
+    added removed improved new old
+""".split())
+
+_SPANISH_SUFFIXES = ('ción', 'ciones', 'mente', 'ado', 'ados', 'ada', 'adas',
+                     'ido', 'idos', 'ida', 'idas')
+_ENGLISH_SUFFIXES = ('tion', 'tions', "n't", "'s")
+_WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+
+@lru_cache(maxsize=4096)
+def is_english(text):
+    """
+    Detección local y rápida: indica si el texto ya está en inglés (y no hay
+    que traducirlo). Cuenta palabras propias de cada idioma por listas de
+    palabras frecuentes, tildes y terminaciones; ante la duda devuelve False.
+    """
+    spanish = english = 0
+    words = _WORD.findall(text.lower())
+    for word in words:
+        if word in _SPANISH_WORDS or word.endswith(_SPANISH_SUFFIXES) or \
+                any(char in 'áéíóúñü' for char in word):
+            spanish += 1
+        elif word in _ENGLISH_WORDS or word.endswith(_ENGLISH_SUFFIXES) or \
+                (len(word) > 4 and word.endswith(('ing', 'ed'))):
+            english += 1
+    if english >= 2:
+        return english > 3 * spanish
+    # Textos muy cortos ("Enabled", "Link down"): basta una palabra inglesa
+    return english == 1 and spanish == 0 and len(words) <= 3
+
+
+# Contadores del informe en curso (ver collect_language_savings); los hilos de
+# las secciones los heredan al copiar el contexto
+_language_savings = contextvars.ContextVar('language_savings', default=None)
+_language_savings_lock = threading.Lock()
+
+
+@contextmanager
+def collect_language_savings():
+    """
+    Cuenta aparte lo ahorrado por la detección de idioma en un informe, para
+    que varios informes seguidos o en paralelo (modo batch) no se mezclen.
+    """
+    counters = {}
+    token = _language_savings.set(counters)
+    try:
+        yield counters
+    finally:
+        _language_savings.reset(token)
+
+
+def in_current_context(func):
+    """
+    Envuelve func para ejecutarla en otro hilo con el contexto del hilo actual
+    (p. ej. los contadores del informe); cada llamada usa su propia copia.
+    """
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(func, *args)
+
+
+def _count_language_savings(name, value=1):
+    tracer.count(name, value)
+    counters = _language_savings.get()
+    if counters is not None:
+        with _language_savings_lock:
+            counters[name] = counters.get(name, 0) + value
+
+
+def _skip_english(text, requests=0):
+    """Anota en la traza lo que no se envía al traductor por estar ya en inglés."""
+    _count_language_savings('langid.segments')
+    _count_language_savings('langid.chars', len(text))
+    if requests:
+        _count_language_savings('langid.requests', requests)
+
+
+def format_language_savings(counters=None):
+    """
+    Resumen de lo ahorrado por la detección de idioma, o None. Sin counters
+    se usa la traza actual (la del último informe de la interfaz).
+    """
+    if counters is None:
+        counters = tracer.counters()
+    if not counters.get('langid.segments'):
+        return None
+    return (f"{counters['langid.segments']} fragmentos ya en inglés: "
+            f"{counters.get('langid.chars', 0)} caracteres y "
+            f"{counters.get('langid.requests', 0)} peticiones ahorradas")
+
+
+def translation_chunk_size():
+    """Tamaño de los trozos de un texto largo: cerca del límite del motor, con margen."""
+    return int(get_translation_backend().max_chars * 0.9)
+
+
+def translate_text(text, target='en', max_in_flight=None):
+    """
+    Traduce texto del español a target con sistema de reintentos.
+    Los textos largos se dividen en oraciones completas que se agrupan en
+    trozos cerca del límite del motor; los trozos se traducen en paralelo
+    (hasta max_in_flight a la vez) y se vuelven a unir con los separadores
+    originales, así que se conservan los párrafos y saltos de línea.
+    """
+    if not text or not text.strip():
+        return text
+    
+    try:
+        text = text.strip()
+        max_chars = translation_chunk_size()
+        # Lo que ya está en inglés solo se salta cuando el destino es inglés
+        keep = is_english if target == 'en' else None
+        
+        if keep is not None and keep(text):
+            _skip_english(text, requests=-(-len(text) // max_chars))
+            return text
+        
+        pieces = split_sentences(text)
+        if len(text) <= max_chars and len(pieces) == 1:
+            return translate_chunk(text, target)
+        
+        # Las oraciones que ya están en inglés se quedan como están, salvo que
+        # sacarlas parta el texto en más peticiones de las que ahorra
+        chunks = pack_sentences(pieces, max_chars)
+        skipping = pack_sentences(pieces, max_chars, keep=keep)
+        to_translate = [chunk for chunk, _, translate in skipping if translate]
+        if len(to_translate) <= len(chunks):
+            for chunk, _, translate in skipping:
+                if not translate:
+                    _skip_english(chunk)
+            if len(to_translate) < len(chunks):
+                _count_language_savings('langid.requests', len(chunks) - len(to_translate))
+            chunks = skipping
+        else:
+            to_translate = [chunk for chunk, _, _ in chunks]
+        
+        workers = min(max_in_flight or TRANSLATION_MAX_IN_FLIGHT, len(to_translate))
+        if workers <= 1:
+            translated_chunks = [translate_chunk(chunk, target) for chunk in to_translate]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                task = in_current_context(translate_chunk)
+                translated_chunks = list(executor.map(task, to_translate,
+                                                      [target] * len(to_translate)))
+        
+        translated_chunks = iter(translated_chunks)
+        return ''.join((next(translated_chunks) if translate else chunk) + separator
+                       for chunk, separator, translate in chunks)
+        
+    except Exception as e:
+        print(f"🚨 Error general: {e}")
+        return text
+
+
+def translate_to_english(text, max_in_flight=None):
+    """Traduce texto de español a inglés (ver translate_text)."""
+    return translate_text(text, 'en', max_in_flight)
+
+
+# Tamaño del primer trozo en la traducción progresiva (los siguientes doblan)
+STREAM_FIRST_CHUNK_CHARS = 300
+
+
+def iter_translate_text(text, target='en', max_in_flight=None):
+    """
+    Versión progresiva de translate_text: devuelve el texto traducido a
+    trozos, en orden, en cuanto está listo todo lo anterior. Los trozos se
+    traducen en paralelo; el primero es pequeño para que haya algo que
+    mostrar enseguida y los siguientes crecen hasta el límite del motor.
+    ''.join() de lo devuelto es el texto traducido completo.
+    """
+    if not text or not text.strip():
+        yield text
+        return
+    
+    text = text.strip()
+    keep = is_english if target == 'en' else None
+    chunks = pack_sentences(split_sentences(text), translation_chunk_size(), keep=keep,
+                            first_chars=STREAM_FIRST_CHUNK_CHARS)
+    for chunk, _, translate in chunks:
+        if not translate:
+            _skip_english(chunk)
+    
+    workers = max(1, min(max_in_flight or TRANSLATION_MAX_IN_FLIGHT, len(chunks)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stream')
+    try:
+        task = in_current_context(translate_chunk)
+        futures = [executor.submit(task, chunk, target) if translate else None
+                   for chunk, _, translate in chunks]
+        for (chunk, separator, _), future in zip(chunks, futures):
+            try:
+                translated = future.result() if future else chunk
+            except Exception as e:
+                print(f"🚨 Error general: {e}")
+                translated = chunk
+            yield translated + separator
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def translate_chunk(chunk, target='en'):
+    """
+    Traduce un trozo de varias oraciones en una sola petición. Si la respuesta
+    llega truncada o con otro número de saltos de línea, se traduce oración a
+    oración (en lotes) para no perder texto ni la maquetación.
+    """
+    if not has_words(chunk):
+        return chunk
+    
+    cached = translation_cache.get(chunk, target=target)
+    if cached is not None:
+        return cached
+    
+    pieces = split_sentences(chunk)
+    if len(pieces) == 1:
+        return _translate_uncached(chunk, target=target)
+    
+    try:
+        with tracer.span('translate.chunk', sentences=len(pieces) // 2 + 1, chars=len(chunk),
+                         target=target):
+            translated = _provider_translate(chunk, target=target, validate=not_truncated(chunk))
+    except Exception as e:
+        print(f"⚠️ Trozo de {len(chunk)} caracteres falló: {e}")
+        translated = ''
+    
+    if not_truncated(chunk)(translated) and translated.count('\n') == chunk.count('\n'):
+        translation_cache.put(chunk, translated, target=target)
+        return translated
+    
+    print(f"⚠️ Trozo de {len(pieces) // 2 + 1} oraciones sin traducir completo, traduciendo por oraciones")
+    pieces[0::2] = translate_batch(pieces[0::2], target=target)
+    return ''.join(pieces)
+
+
+def _translate_uncached(text, max_retries=3, target='en'):
+    """Traduce contra el proveedor (sin consultar la caché) y guarda el resultado."""
+    original_length = len(text)
+    
+    for attempt in range(max_retries):
+        with tracer.span('translate.attempt', attempt=attempt + 1, chars=original_length,
+                         target=target) as info:
+            try:
+                translated = _provider_translate(text, target=target,
+                                                 validate=not_truncated(text))
+                
+                if len(translated) >= original_length * 0.3:
+                    info['result'] = 'ok'
+                    translation_cache.put(text, translated, target=target)
+                    return translated
+                else:
+                    # El limitador retrasa el siguiente intento (espera con jitter)
+                    info['result'] = 'truncated'
+                    print(f"⚠️ Intento {attempt + 1}: Traducción corta")
+                        
+            except Exception as e:
+                info['result'] = f'error: {e}'
+                print(f"⚠️ Intento {attempt + 1} falló: {e}")
+        if attempt < max_retries - 1:
+            tracer.count('translate.retry')
+    
+    print(f"⚠️ No se pudo traducir después de {max_retries} intentos")
+    return text
+
+
+# Tamaño máximo de una petición que agrupa varios segmentos cortos
+BATCH_MAX_CHARS = 1500
+
+
+def translate_batch(segments, max_chars=BATCH_MAX_CHARS, target='en'):
+    """
+    Traduce una lista de segmentos cortos con el menor número de peticiones.
+    Los segmentos se envían uno por línea en paquetes de hasta max_chars y
+    la respuesta se vuelve a dividir por líneas. Devuelve las traducciones
+    en el mismo orden que segments.
+    """
+    results = list(segments)
+    pending = {}
+    # El glosario y la detección de idioma son de español -> inglés
+    terms = get_glossary() if target == 'en' else None
+    
+    for i, segment in enumerate(segments):
+        if not segment or not has_words(segment):
+            continue
+        segment = segment.strip()
+        if segment in pending:
+            pending[segment].append(i)
+            continue
+        # El glosario va antes que la caché y que cualquier petición
+        offline = terms.translate_offline(segment) if terms else None
+        if offline is not None:
+            tracer.count('glossary.hit')
+            results[i] = offline
+            continue
+        cached = translation_cache.get(segment, target=target)
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending[segment] = [i]
+    
+    english = [segment for segment in pending if is_english(segment)] if terms else []
+    if english:
+        saved = len(_pack_batches(pending, max_chars))
+        for segment in english:
+            _skip_english(segment)
+            del pending[segment]
+        _count_language_savings('langid.requests', saved - len(_pack_batches(pending, max_chars)))
+    
+    if not pending:
+        return results
+    
+    batches = _pack_batches(pending, max_chars)
+    
+    workers = min(TRANSLATION_MAX_IN_FLIGHT, len(batches))
+    if workers <= 1:
+        translated_batches = [_translate_packed(batch, target) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            task = in_current_context(_translate_packed)
+            translated_batches = list(executor.map(task, batches, [target] * len(batches)))
+    
+    for batch, translated_batch in zip(batches, translated_batches):
+        for segment, translated in zip(batch, translated_batch):
+            for i in pending[segment]:
+                results[i] = translated
+    
+    return results
+
+
+def _pack_batches(segments, max_chars):
+    """Reparte los segmentos en paquetes de hasta max_chars (uno por línea)."""
+    batches = []
+    current = []
+    current_size = 0
+    for segment in segments:
+        # Los segmentos con saltos de línea romperían la división por líneas
+        if '\n' in segment or len(segment) > max_chars:
+            batches.append([segment])
+            continue
+        if current and current_size + len(segment) + 1 > max_chars:
+            batches.append(current)
+            current = []
+            current_size = 0
+        current.append(segment)
+        current_size += len(segment) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _translate_packed(batch, target='en'):
+    """
+    Traduce un paquete de segmentos en una sola petición (uno por línea).
+    Si la respuesta no se puede dividir en el mismo número de líneas, o algún
+    segmento llega truncado, se traduce el paquete segmento a segmento.
+    """
+    if len(batch) == 1:
+        return [_translate_uncached(batch[0], target=target)]
+    
+    try:
+        with tracer.span('translate.batch', segments=len(batch),
+                         chars=sum(len(segment) + 1 for segment in batch), target=target):
+            joined = '\n'.join(batch)
+            translated = _provider_translate(joined, target=target, validate=not_truncated(joined))
+    except Exception as e:
+        print(f"⚠️ Lote de {len(batch)} segmentos falló: {e}")
+        translated = ''
+    
+    lines = [line.strip() for line in (translated or '').split('\n') if line.strip()]
+    if len(lines) == len(batch) and all(
+            len(line) >= len(segment) * 0.3 for segment, line in zip(batch, lines)):
+        for segment, line in zip(batch, lines):
+            translation_cache.put(segment, line, target=target)
+        return lines
+    
+    print(f"⚠️ No se pudo dividir el lote ({len(lines)}/{len(batch)} líneas), traduciendo por separado")
+    return [_translate_uncached(segment, target=target) for segment in batch]
 
-translator = GoogleTranslator(source='es', target='en')
 
-tool = None
+def translate_by_sentences(text, target='en'):
+    """Divide texto en oraciones y las traduce agrupadas en lotes, conservando los separadores."""
+    pieces = split_sentences(text.strip())
+    pieces[0::2] = translate_batch(pieces[0::2], target=target)
+    return ''.join(pieces)
 
-def init_language_tool():
-    global tool
-    if tool is None:
-        try:
-            tool = language_tool_python.LanguageTool('en-US')
-        except:
-            pass
-    return tool
+GRAMMAR_CACHE_MAX_ENTRIES = 5000
+
+
+class GrammarCache:
+    """Caché LRU en memoria de oraciones ya corregidas (oración -> corrección)."""
+
+    def __init__(self, max_entries=GRAMMAR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sentence):
+        with self._lock:
+            corrected = self._entries.get(sentence)
+            if corrected is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sentence)
+            self.hits += 1
+            return corrected
+
+    def put(self, sentence, corrected):
+        with self._lock:
+            self._entries[sentence] = corrected
+            self._entries.move_to_end(sentence)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+grammar_cache = GrammarCache()
 
-import time
 
-def translate_to_english(text):
+def _apply_corrections(text, matches, base_offset=0):
     """
-    Traduce texto de español a inglés con sistema de reintentos.
-    Optimizado para uso individual con IPs únicas.
+    Aplica la primera sugerencia de cada match (como language_tool_python.utils.correct),
+    con offsets relativos a un texto mayor que empieza en base_offset.
+    """
+    result = text
+    shift = 0
+    for match in sorted(matches, key=lambda m: m.offset):
+        if not match.replacements:
+            continue
+        start = match.offset - base_offset + shift
+        end = start + match.errorLength
+        if start < 0 or end > len(result):
+            continue
+        replacement = match.replacements[0]
+        result = result[:start] + replacement + result[end:]
+        shift += len(replacement) - match.errorLength
+    return result
+
+
+def correct_grammar(text):
+    """
+    Corrige la gramática oración por oración. Las oraciones ya corregidas
+    salen de la caché y solo las nuevas se envían a LanguageTool, todas
+    juntas en una única comprobación.
     """
     if not text or not text.strip():
         return text
-    
     try:
-        text = text.strip()
-        MAX_CHUNK_SIZE = 250
-        
-        if len(text) <= MAX_CHUNK_SIZE:
-            return translate_with_retry(text)
-        
-        sentences = text.replace('. ', '.|').replace('? ', '?|').replace('! ', '!|').split('|')
-        translated_sentences = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
+        pieces = split_sentences(text)
+        # Índices pares: oraciones; impares: separadores
+        corrected = {}
+        missing = []
+        for i in range(0, len(pieces), 2):
+            sentence = pieces[i]
+            if not sentence.strip():
                 continue
-            
-            translated = translate_with_retry(sentence)
-            translated_sentences.append(translated)
-        
-        return ' '.join(translated_sentences)
-        
-    except Exception as e:
-        print(f"🚨 Error general: {e}")
+            cached = grammar_cache.get(sentence)
+            if cached is not None:
+                corrected[i] = cached
+            elif sentence not in missing:
+                missing.append(sentence)
+        
+        tracer.count('grammar.cached', len(corrected))
+        if missing:
+            with tracer.span('grammar.check', sentences=len(missing),
+                             chars=sum(len(sentence) for sentence in missing)):
+                fresh = _check_sentences(missing)
+            if fresh is None:
+                # Corrector no disponible: se devuelven sin corregir y sin cachear
+                fresh = {sentence: sentence for sentence in missing}
+            for i in range(0, len(pieces), 2):
+                if i not in corrected and pieces[i] in fresh:
+                    corrected[i] = fresh[pieces[i]]
+        
+        for i, sentence in corrected.items():
+            pieces[i] = sentence
+        return ''.join(pieces)
+    except:
         return text
 
 
-def translate_with_retry(text, max_retries=3):
+def _check_sentences(sentences):
     """
-    Intenta traducir con reintentos automáticos.
-    Valida que la traducción no esté truncada.
+    Comprueba varias oraciones con una sola llamada a LanguageTool y guarda
+    cada corrección en la caché. Devuelve {oración: corregida} o None.
     """
-    original_length = len(text)
+    combined = '\n\n'.join(sentences)
+    matches = grammar_tool.check(combined)
+    if matches is None:
+        return None
     
-    for attempt in range(max_retries):
-        try:
-            translated = translator.translate(text)
-            
-            if len(translated) >= original_length * 0.3:
-                return translated
-            else:
-                print(f"⚠️ Intento {attempt + 1}: Traducción corta")
-                if attempt < max_retries - 1:
-                    time.sleep(0.5)
-                    
-        except Exception as e:
-            print(f"⚠️ Intento {attempt + 1} falló: {e}")
-            if attempt < max_retries - 1:
-                time.sleep(0.5)
+    results = {}
+    offset = 0
+    for sentence in sentences:
+        end = offset + len(sentence)
+        own = [m for m in matches if offset <= m.offset and m.offset + m.errorLength <= end]
+        fixed = _apply_corrections(sentence, own, offset)
+        grammar_cache.put(sentence, fixed)
+        results[sentence] = fixed
+        offset = end + 2
+    return results
+
+# ========== IDENTIFICADORES PROTEGIDOS ==========
+
+# Texto que no se traduce ni se corrige: se sustituye por un marcador antes
+# de enviarlo al traductor y se restaura después. El orden importa: en una
+# misma posición gana el primer patrón.
+PROTECTED_PATTERNS = [
+    # Líneas de log: empiezan por fecha/hora o por la marca de tiempo del kernel
+    ('log', r'^[ \t]*(?:\[\s*\d+\.\d+\]|\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}|\d{2}:\d{2}:\d{2}'
+            r'|[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2}).*$'),
+    # Comandos: entre comillas invertidas o líneas con prompt ("$ ls", "root@router:~# reboot")
+    ('command', r'`[^`\n]+`|^[ \t]*[\w.@:~/-]*[$#>][ \t]+\S.*$'),
+    ('url', r'\b(?:https?|ftp)://[^\s<>"]*[^\s<>".,;:!?)]'),
+    ('path', r'(?<![\w/])/(?:[\w.-]+/)+[\w-]*(?:\.[\w-]+)*'),
+    ('mac', r'\b[0-9A-Fa-f]{2}(?:[:-][0-9A-Fa-f]{2}){5}\b'),
+    ('ipv6', r'\b(?:[0-9A-Fa-f]{1,4}:){7}[0-9A-Fa-f]{1,4}\b'
+             r'|\b(?:[0-9A-Fa-f]{1,4}:)+:(?:[0-9A-Fa-f]{1,4}(?::[0-9A-Fa-f]{1,4})*)?'),
+    ('ipv4', r'\b(?:\d{1,3}\.){3}\d{1,3}(?:/\d{1,2}|:\d{1,5})?\b'),
+    ('version', r'\b[vV]\d+(?:\.\d+)+(?:[-+][0-9A-Za-z]+)*\b|\b\d+(?:\.\d+){2,}(?:[-+][0-9A-Za-z]+)*\b'),
+    ('hex', r'\b0x[0-9A-Fa-f]+\b'),
+    # Números de serie y modelos: mayúsculas y dígitos mezclados, 6 caracteres o más
+    ('serial', r'\b(?=[A-Z0-9-]{6,}\b)(?=[A-Z0-9-]*\d)(?=[A-Z0-9-]*[A-Z])[A-Z0-9]+(?:-[A-Z0-9]+)*\b'),
+]
+
+_PROTECTED = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in PROTECTED_PATTERNS),
+                        re.MULTILINE)
+
+# El traductor a veces añade espacios dentro del marcador
+_PLACEHOLDER = re.compile(r'⟦\s*(\d+)\s*⟧')
+
+# Una letra (no dígito ni símbolo): sin letras no hay nada que traducir
+_LETTER = re.compile(r'[^\W\d_]')
+
+
+def has_words(text):
+    return _LETTER.search(text) is not None
+
+
+def mask_protected(text):
+    """
+    Sustituye los identificadores (MAC, IP, versiones, números de serie,
+    comandos, rutas, líneas de log...) por marcadores ⟦n⟧. Los repetidos
+    comparten marcador. Devuelve (texto_enmascarado, lista_de_tokens).
+    """
+    masked, tokens = _mask_protected(text)
+    return masked, list(tokens)
+
+
+@lru_cache(maxsize=1024)
+def _mask_protected(text):
+    tokens = {}
     
-    print(f"⚠️ No se pudo traducir después de {max_retries} intentos")
-    return text
+    def replace(match):
+        token = match.group()
+        if token not in tokens:
+            tokens[token] = len(tokens)
+        return f'⟦{tokens[token]}⟧'
+    
+    return _PROTECTED.sub(replace, text), tuple(tokens)
 
 
-def translate_by_sentences(text):
-    """Divide texto en oraciones y traduce cada una."""
-    import time
+def unmask_protected(text, tokens, strict=True):
+    """
+    Restaura los marcadores de mask_protected(); None si falta alguno
+    (con strict=False se restauran los que haya, para textos parciales).
+    """
+    found = set()
     
-    sentences = text.replace('. ', '.|').replace('? ', '?|').replace('! ', '!|').split('|')
-    translated_sentences = []
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(tokens):
+            return match.group()
+        found.add(index)
+        return tokens[index]
     
-    for i, sentence in enumerate(sentences):
-        sentence = sentence.strip()
-        if not sentence:
-            continue
-        
-        try:
-            if i > 0:
-                time.sleep(0.2)
-            
-            translated = translator.translate(sentence)
-            
-            if len(translated) >= len(sentence) * 0.3:
-                translated_sentences.append(translated)
-            else:
-                print(f"⚠️ Oración truncada, usando original")
-                translated_sentences.append(sentence)
-                
-        except Exception as e:
-            print(f"⚠️ Error en oración: {e}")
-            translated_sentences.append(sentence)
+    restored = _PLACEHOLDER.sub(replace, text)
+    return restored if not strict or len(found) == len(tokens) else None
+
+
+def translate_protected(text, translate):
+    """
+    Traduce text con translate() sin enviar los identificadores protegidos.
+    Si solo hay identificadores no se hace ninguna petición, y si el
+    traductor pierde algún marcador se traduce el texto sin enmascarar.
+    """
+    masked, tokens = mask_protected(text)
+    if not tokens:
+        return translate(text)
+    
+    tracer.count('mask.tokens', len(tokens))
+    if not has_words(masked):
+        tracer.count('mask.skipped')
+        return text
     
-    return ' '.join(translated_sentences)
+    restored = unmask_protected(translate(masked), tokens)
+    if restored is None:
+        print("⚠️ El traductor alteró los identificadores protegidos, traduciendo sin enmascarar")
+        return translate(text)
+    return restored
 
-def correct_grammar(text):
+
+def _translate_and_correct(text, target='en'):
+    with tracer.span('translate', chars=len(text), target=target):
+        translated = translate_text(text, target)
+    # El corrector solo está configurado para inglés
+    if target != 'en':
+        return translated
+    # La corrección también se hace con los marcadores para que no toque los identificadores
+    with tracer.span('grammar', chars=len(translated)):
+        return correct_grammar(translated)
+
+
+def translate_and_correct(text, target='en'):
     if not text or not text.strip():
         return text
-    try:
-        lt = init_language_tool()
-        if lt:
-            matches = lt.check(text)
-            return language_tool_python.utils.correct(text, matches)
-        return text
-    except:
-        return text
+    return translate_protected(text, lambda masked: _translate_and_correct(masked, target))
 
-def translate_and_correct(text):
+def iter_translate_and_correct(text, target='en'):
+    """
+    Versión progresiva de translate_and_correct. Devuelve ('partial', trozo)
+    por cada trozo traducido, en orden y ya sin marcadores, y al terminar
+    ('final', texto) con el texto completo corregido, que puede diferir de
+    lo ya devuelto solo en las correcciones gramaticales.
+    """
     if not text or not text.strip():
-        return text
-    return correct_grammar(translate_to_english(text))
+        yield 'final', text
+        return
+    
+    masked, tokens = mask_protected(text)
+    if tokens:
+        tracer.count('mask.tokens', len(tokens))
+        if not has_words(masked):
+            tracer.count('mask.skipped')
+            yield 'final', text
+            return
+    
+    streamed = []
+    with tracer.span('translate', chars=len(masked), target=target, streamed=True):
+        for piece in iter_translate_text(masked, target):
+            streamed.append(piece)
+            yield 'partial', unmask_protected(piece, tokens, strict=False)
+    
+    translated = ''.join(streamed)
+    if target == 'en':
+        with tracer.span('grammar', chars=len(translated)):
+            translated = correct_grammar(translated)
+    
+    restored = unmask_protected(translated, tokens)
+    if restored is None:
+        print("⚠️ El traductor alteró los identificadores protegidos, traduciendo sin enmascarar")
+        restored = _translate_and_correct(text, target)
+    yield 'final', restored
+
 
-def translate_equipment_info(text):
+def translate_equipment_info(text, target='en'):
     """
     Traduce información de equipo línea por línea.
-    Usa división por oraciones para valores largos.
+    Las etiquetas y valores cortos se traducen juntos en lotes (lo que cubre
+    el glosario no llega a enviarse); los valores solo se traducen si
+    mencionan algún término del glosario, y los largos usan división por
+    oraciones.
     """
     if not text or not text.strip():
         return text
     
-    translations = {
-        'nombre del equipo': 'Equipment', 'nombre': 'Equipment',
-        'modelo': 'Model', 'número de serie': 'Serial Number', 'serial': 'Serial Number',
-        'versión hardware': 'Hardware Version', 'versión software': 'Software Version',
-        'versión firmware': 'Firmware Version', 'código de país': 'Country Code',
-        'product id': 'Product ID', 'estado': 'State', 'versión': 'Version',
-    }
+    terms = get_glossary()
     
-    lines = text.split('\n')
-    result = []
+    # Primera pasada: decidir qué partes hay que traducir. Las partes
+    # pendientes se guardan como índices en segments y se traducen juntas.
+    # Cada línea se enmascara antes de separar etiqueta y valor, así que
+    # los ':' de una MAC o una IPv6 no se confunden con el separador.
+    segments = []
+    
+    def pending(segment):
+        segments.append(segment)
+        return len(segments) - 1
+    
+    layout = []
     
-    for line in lines:
+    for line in text.split('\n'):
         line = line.strip()
         if not line:
-            result.append('')
+            layout.append(('', None, line, []))
+            continue
+        
+        masked, tokens = mask_protected(line)
+        tracer.count('mask.tokens', len(tokens))
+        
+        if ':' in masked:
+            parts = masked.split(':', 1)
+            field = parts[0].strip()
+            value = parts[1].strip()
+            
+            field_part = (terms.label(field) if target == 'en' else None) or pending(field)
+            
+            if len(value) > 80:
+                try:
+                    value_part = translate_text(value, target)
+                except:
+                    value_part = value
+            elif terms.mentions(value):
+                value_part = pending(value)
+            else:
+                value_part = value
+            
+            layout.append((field_part, value_part, line, tokens))
+        elif len(masked) <= 250:
+            layout.append((pending(masked), None, line, tokens))
+        else:
+            try:
+                layout.append((translate_text(masked, target), None, line, tokens))
+            except:
+                layout.append((masked, None, line, tokens))
+    
+    try:
+        translated = translate_batch(segments, target=target)
+    except Exception as e:
+        print(f"⚠️ Error traduciendo Equipment Info: {e}")
+        translated = segments
+    
+    def resolve(part):
+        return translated[part] if isinstance(part, int) else part
+    
+    result = []
+    for field_part, value_part, line, tokens in layout:
+        if value_part is None:
+            masked_result = resolve(field_part)
+        else:
+            masked_result = f"{resolve(field_part)}: {resolve(value_part)}"
+        # Si el traductor perdió algún marcador se deja la línea original
+        result.append(unmask_protected(masked_result, tokens) or line)
+    
+    return '\n'.join(result)
+
+# Idiomas de destino de los informes (el inglés es el del informe principal)
+LANGUAGES = {
+    'en': 'Inglés', 'fr': 'Francés', 'de': 'Alemán', 'pt': 'Portugués', 'it': 'Italiano',
+}
+
+
+def parse_languages(value):
+    """Convierte "en,fr" en ('en', 'fr'); ValueError si algún idioma no está en LANGUAGES."""
+    if isinstance(value, str):
+        value = value.split(',')
+    targets = []
+    for code in value:
+        code = code.strip().lower()
+        if code and code not in targets:
+            targets.append(code)
+    unknown = [code for code in targets if code not in LANGUAGES]
+    if unknown or not targets:
+        raise ValueError(f"Idioma desconocido: {', '.join(unknown) or '(vacío)'} "
+                         f"(disponibles: {', '.join(LANGUAGES)})")
+    return tuple(targets)
+
+
+# Función de traducción de cada sección del informe: f(texto, idioma_destino)
+SECTION_TRANSLATORS = {
+    'summary': translate_and_correct,
+    'equipment': translate_equipment_info,
+    'description': translate_and_correct,
+    'procedure': translate_and_correct,
+    'expected': translate_and_correct,
+}
+
+
+# Numeración de un paso pegado o importado: "3.", "3)", "3-", con o sin sangría
+# (no "192.168.1.1" ni "2024-05", que son parte del texto)
+_STEP_NUMBER = re.compile(r'^\s*\d+\s*[.)-](?!\d)\s*')
+
+
+def parse_steps(text):
+    """Devuelve los pasos de un texto (una línea por paso) sin su numeración."""
+    steps = []
+    for line in text.split('\n'):
+        step = _STEP_NUMBER.sub('', line.strip()).strip()
+        if step:
+            steps.append(step)
+    return steps
+
+
+def format_steps(steps):
+    return '\n'.join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
+
+def number_steps(text):
+    """Quita la numeración existente y numera de nuevo las líneas con contenido."""
+    return format_steps(parse_steps(text))
+
+
+STEP_FILE_TYPES = [("Pasos", "*.txt *.csv *.docx"), ("Texto", "*.txt"),
+                   ("CSV", "*.csv"), ("Word", "*.docx")]
+
+
+def read_steps_file(path):
+    """Lee los pasos de un .txt, .csv (una fila por paso) o .docx (un párrafo por paso)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.txt':
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return parse_steps(f.read())
+    if extension == '.csv':
+        import csv
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+                delimiter = dialect.delimiter
+            except csv.Error:
+                # Filas con distinto número de columnas: vale un separador que
+                # aparezca en todas las líneas
+                lines = [line for line in sample.splitlines() if line.strip()]
+                dialect = csv.excel
+                delimiter = next((candidate for candidate in ';\t'
+                                  if lines and all(candidate in line for line in lines)), ',')
+            rows = [row for row in csv.reader(f, dialect, delimiter=delimiter)
+                    if any(cell.strip() for cell in row)]
+        
+        # Solo se quita una primera columna con el número del paso (y la cabecera
+        # de esa tabla); el resto de la fila se vuelve a unir con el mismo
+        # separador para que las comas del propio paso no se pierdan
+        def numbered(row):
+            return len(row) > 1 and re.fullmatch(r'\d+\.?', row[0].strip())
+        
+        if rows and not numbered(rows[0]) and len(rows) > 1 and all(numbered(row) for row in rows[1:]):
+            rows = rows[1:]
+        lines = [delimiter.join(row[1:] if numbered(row) else row) for row in rows]
+        return parse_steps('\n'.join(lines))
+    if extension == '.docx':
+        Document, _, _ = load_docx()
+        return parse_steps('\n'.join(p.text for p in Document(path).paragraphs))
+    raise ValueError(f"Formato no soportado: {extension or path}")
+
+
+# ========== FICHEROS DE LOG ==========
+# Los logs de los equipos pueden ocupar cientos de MB: se leen por trozos de
+# tamaño fijo y solo se guardan las primeras y últimas líneas que interesan.
+
+LOG_HEAD_LINES = 100
+LOG_TAIL_LINES = 400
+LOG_CHUNK_BYTES = 1 << 20
+LOG_MAX_LINE_CHARS = 2000
+LOG_FILE_TYPES = [("Logs", "*.log *.txt"), ("Todos los ficheros", "*.*")]
+
+LOG_LEVELS = {
+    'ERROR': ('ERROR', 'ERR', 'FATAL', 'CRITICAL', 'CRIT', 'EMERG', 'ALERT'),
+    'WARN': ('WARNING', 'WARN'),
+    'INFO': ('INFO', 'NOTICE'),
+    'DEBUG': ('DEBUG', 'TRACE', 'VERBOSE'),
+}
+
+
+def log_line_filter(levels=None, pattern=None):
+    """
+    Devuelve una función que indica si una línea de log pasa el filtro (alguno
+    de los niveles y la expresión regular), o None si no hay nada que filtrar.
+    """
+    checks = []
+    if levels:
+        unknown = [level for level in levels if level.upper() not in LOG_LEVELS]
+        if unknown:
+            raise ValueError(f"Nivel de log desconocido: {', '.join(unknown)} "
+                             f"(disponibles: {', '.join(LOG_LEVELS)})")
+        # ERROR, error y Error sin IGNORECASE, que hace la búsqueda varias veces más lenta
+        words = [variant for level in levels for word in LOG_LEVELS[level.upper()]
+                 for variant in (word, word.lower(), word.capitalize())]
+        initials = ''.join(sorted({word[0] for word in words}))
+        checks.append(re.compile(rf"(?=[{initials}])\b(?:{'|'.join(words)})\b").search)
+    if pattern:
+        try:
+            checks.append(re.compile(pattern).search)
+        except re.error as e:
+            raise ValueError(f"Expresión regular no válida: {e}")
+    if len(checks) < 2:
+        return checks[0] if checks else None
+    return lambda line: all(check(line) for check in checks)
+
+
+def _decode_log_line(raw):
+    line = raw.rstrip(b'\r').decode('utf-8', errors='replace')
+    if len(line) > LOG_MAX_LINE_CHARS:
+        line = line[:LOG_MAX_LINE_CHARS] + " [...]"
+    return line
+
+
+def iter_log_lines(path, chunk_size=LOG_CHUNK_BYTES):
+    """Recorre un fichero de log línea a línea leyendo trozos de tamaño fijo."""
+    with open(path, 'rb') as f:
+        pending = b''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            # Una línea sin fin (un volcado binario) no puede crecer sin límite
+            pending = lines.pop()[:chunk_size]
+            for raw in lines:
+                yield _decode_log_line(raw)
+        if pending:
+            yield _decode_log_line(pending)
+
+
+def _read_last_lines(path, count, chunk_size=LOG_CHUNK_BYTES):
+    """Últimas count líneas leyendo el fichero hacia atrás; devuelve (líneas, bytes omitidos)."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = position = f.tell()
+        data = b''
+        while position > 0 and data.count(b'\n') <= count:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    if data.endswith(b'\n'):
+        data = data[:-1]
+    raw_lines = data.split(b'\n') if data else []
+    if count == 0:
+        raw_lines = []
+    elif len(raw_lines) > count:
+        raw_lines = raw_lines[-count:]
+    # Las líneas conservadas son un sufijo de data: empiezan en este offset del fichero
+    start = position + len(data) - len(b'\n'.join(raw_lines)) if raw_lines else size
+    return [_decode_log_line(raw) for raw in raw_lines], start
+
+
+def read_log_excerpt(path, head=LOG_HEAD_LINES, tail=LOG_TAIL_LINES, levels=None, pattern=None):
+    """
+    Extracto de un fichero de log: las primeras head y las últimas tail líneas
+    que pasan el filtro, con una marca en medio (en inglés, como el resto del
+    informe) si se omitieron líneas.
+    La memoria usada depende de head + tail, no del tamaño del fichero.
+    Devuelve (texto, estadísticas).
+    """
+    matches = log_line_filter(levels, pattern)
+    stats = {'file': os.path.basename(path), 'bytes': os.path.getsize(path)}
+    
+    with tracer.span('logs.read', bytes=stats['bytes']):
+        if matches is None and head == 0:
+            # Modo cola sin filtro: no hace falta recorrer todo el fichero
+            last, skipped = _read_last_lines(path, tail)
+            stats.update(lines=None, matched=None, shown=len(last))
+            parts = [f"[... {skipped} earlier bytes omitted ...]"] if skipped else []
+            return '\n'.join(parts + last), stats
+        
+        first, last = [], deque(maxlen=tail)
+        total = matched = 0
+        for line in iter_log_lines(path):
+            total += 1
+            if matches is not None and not matches(line):
+                continue
+            matched += 1
+            if len(first) < head:
+                first.append(line)
+            else:
+                last.append(line)
+    
+    omitted = matched - len(first) - len(last)
+    stats.update(lines=total, matched=matched, shown=len(first) + len(last))
+    parts = list(first)
+    if omitted:
+        parts.append(f"[... {omitted} lines omitted ...]")
+    parts.extend(last)
+    return '\n'.join(parts), stats
+
+
+def add_attachment(attachments, name):
+    """Añade un fichero a la lista de Attachments si no estaba ya."""
+    names = [item.strip() for item in attachments.split(',') if item.strip()]
+    if name not in names:
+        names.append(name)
+    return ', '.join(names)
+
+
+_STEP_PREFIX = re.compile(r'^(\d+)\.\s*')
+
+
+def renumber_edits(lines, start_num=1, clear_empty=True):
+    """Calcula los cambios mínimos para dejar consecutiva la numeración de los pasos.
+
+    Devuelve (índice de línea, longitud del prefijo actual, prefijo nuevo) solo para
+    las líneas cuyo número cambia; un prefijo nuevo vacío significa vaciar la línea.
+    Con clear_empty las líneas que solo tienen número se vacían y no cuentan como
+    paso; sin él cuentan (es el paso recién creado con Intro).
+    """
+    edits = []
+    number = start_num
+    for index, line in enumerate(lines):
+        match = _STEP_PREFIX.match(line)
+        if not match:
             continue
+        if clear_empty and not line[match.end():].strip():
+            edits.append((index, len(line), ''))
+            continue
+        prefix = f"{number}. "
+        if match.group() != prefix:
+            edits.append((index, match.end(), prefix))
+        number += 1
+    return edits
+
+
+def validate_report_fields(report_type, fields):
+    """Devuelve el mensaje de error si faltan campos obligatorios, o None."""
+    if report_type not in ("OPENED", "REOPENED", "VERIFIED"):
+        return f"Tipo de reparo desconocido: {report_type}"
+    
+    if report_type == "OPENED":
+        if not fields.get('summary', '').strip():
+            return "Summary obligatorio para OPENED"
+        proc = fields.get('procedure', '')
+        if not proc.strip() or proc.strip() == "1.":
+            return "Procedimiento obligatorio para OPENED"
+        if not fields.get('expected', '').strip():
+            return "Resultado Esperado obligatorio para OPENED"
+    
+    if not fields.get('equipment', '').strip():
+        return "Equipment Information requerido"
+    if not fields.get('description', '').strip():
+        return "Descripcion requerida"
+    return None
+
+
+def _traced_section(key, source, target='en'):
+    with tracer.span(f'section.{key}', chars=len(source), target=target):
+        return SECTION_TRANSLATORS[key](source, target)
+
+
+def iter_translated_sections(sections, cancel=None):
+    """
+    Traduce todas las secciones a la vez (no dependen unas de otras, tampoco
+    entre idiomas) y devuelve (clave, idioma, traducción) según van
+    terminando, no en orden. sections es una lista de
+    (clave, texto_original, idioma_destino).
+    """
+    if not sections:
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix='section')
+    try:
+        task = in_current_context(_traced_section)
+        futures = {executor.submit(task, key, source, target): (key, target)
+                   for key, source, target in sections}
+        for future in as_completed(futures):
+            if cancel is not None and cancel.is_set():
+                return
+            key, target = futures[future]
+            yield key, target, future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Secciones que se pueden mostrar según se traducen: f(texto, idioma) -> eventos
+SECTION_STREAMERS = {
+    'summary': iter_translate_and_correct,
+    'description': iter_translate_and_correct,
+    'procedure': iter_translate_and_correct,
+    'expected': iter_translate_and_correct,
+}
+
+
+def _stream_section(key, source, target, emit):
+    with tracer.span(f'section.{key}', chars=len(source), target=target, streamed=True):
+        streamer = SECTION_STREAMERS.get(key)
+        if streamer is None:
+            emit((key, target, 'final', SECTION_TRANSLATORS[key](source, target)))
+            return
+        for kind, payload in streamer(source, target):
+            emit((key, target, kind, payload))
+
+
+def iter_streamed_sections(sections, cancel=None):
+    """
+    Como iter_translated_sections, pero devuelve (clave, idioma, tipo, texto)
+    con tipo 'partial' por cada trozo ya traducido (en orden dentro de su
+    sección) y 'final' con la sección completa y corregida. Las secciones
+    sin versión progresiva (Equipment Information) solo envían 'final'.
+    """
+    if not sections:
+        return
+    
+    events = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=len(sections), thread_name_prefix='section')
+    try:
+        task = in_current_context(_stream_section)
+        futures = [executor.submit(task, key, source, target, events.put)
+                   for key, source, target in sections]
+        for future in futures:
+            future.add_done_callback(lambda _: events.put(None))
+        
+        running = len(futures)
+        while running:
+            event = events.get()
+            if cancel is not None and cancel.is_set():
+                return
+            if event is None:
+                running -= 1
+            else:
+                yield event
+        # Propaga el error de cualquier sección que haya fallado
+        for future in futures:
+            future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def build_report_layout(report_type, fields):
+    """
+    Devuelve los bloques del informe en el orden fijo de cada tipo de reparo.
+    Cada bloque es ('text', texto, tag) para texto fijo o
+    ('section', clave, texto_original) para una sección que hay que traducir.
+    fields contiene summary, equipment, description, logs, procedure,
+    expected y attachments ya limpios.
+    """
+    layout = []
+    
+    def text(content, tag=None):
+        layout.append(('text', content, tag))
+    
+    def section(key):
+        layout.append(('section', key, fields[key]))
+    
+    if report_type == "VERIFIED":
+        text("[Equipment information]:\n")
+        section('equipment')
+        text("\n\n")
+        text("The problem is ")
+        text("VERIFIED", "verified_word")
+        text(" in this version\n\n")
+        section('description')
+        text("\n\n")
+    else:
+        text(f"{report_type}\n")
+        if report_type == "REOPENED":
+            text("The problem continues, ")
+            text("REOPENED", "reopened_word")
+            text(" in this version.\n\n")
+        else:
+            text("\n")
+        
+        if report_type == "OPENED":
+            text("Summary: ")
+            section('summary')
+            text("\n\n")
+        
+        text("[Equipment information]:\n\n")
+        section('equipment')
+        text("\n\n")
         
-        if ':' in line:
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                field = parts[0].strip().lower()
-                value = parts[1].strip()
+        text("[Fault]:\n")
+        section('description')
+        text("\n\n")
+    
+    logs = fields.get('logs')
+    if logs:
+        text("[Console Logs]:\n")
+        text(f"{logs}\n\n", "console_logs")
+    
+    if report_type != "VERIFIED":
+        proc = fields.get('procedure', '')
+        if proc.strip() and proc.strip() != "1.":
+            text("[Procedure]:\n")
+            section('procedure')
+            text("\n\n")
+        
+        if report_type == "OPENED" and fields.get('expected'):
+            text("[Expected]:\n")
+            section('expected')
+            text("\n\n")
+    
+    att = fields.get('attachments')
+    if att:
+        text("[Attachments]:\n")
+        text(f"{att}\n")
+    
+    return layout
+
+
+def section_fingerprint(key, source):
+    """Huella de la entrada de una sección para saber si hay que volver a traducirla."""
+    return hashlib.sha256(f"{key}\x00{source}".encode('utf-8')).hexdigest()
+
+
+def report_structure(layout):
+    """Parte fija del informe (textos y orden de secciones), sin el contenido a traducir."""
+    return tuple((kind, key_or_text, value if kind == 'text' else None)
+                 for kind, key_or_text, value in layout)
+
+
+def render_report_text(layout, results):
+    """Compone el texto final del informe a partir del layout y las traducciones."""
+    parts = []
+    for kind, key_or_text, value in layout:
+        if kind == 'section':
+            parts.append(results.get(key_or_text, value))
+        else:
+            parts.append(key_or_text)
+    return ''.join(parts)
+
+
+def generate_report_texts(report_type, fields, targets=('en',)):
+    """
+    Genera el informe sin interfaz en varios idiomas a la vez (mismo layout
+    que generate()). Devuelve {idioma: texto}.
+    """
+    with tracer.span('generate', report_type=report_type, targets=','.join(targets)):
+        if 'en' in targets:
+            grammar_tool.health_check()
+        layout = build_report_layout(report_type, fields)
+        sections = [(key, source, target) for target in targets
+                    for kind, key, source in layout if kind == 'section']
+        results = {target: {} for target in targets}
+        for key, target, translated in iter_translated_sections(sections):
+            results[target][key] = translated
+        return {target: render_report_text(layout, results[target]) for target in targets}
+
+
+def generate_report_text(report_type, fields, target='en'):
+    """Genera el informe completo sin interfaz en un idioma."""
+    return generate_report_texts(report_type, fields, (target,))[target]
+
+
+def build_word_document(content):
+    """Crea el documento Word del informe con el mismo formato que el preview."""
+    Document, Pt, RGBColor = load_docx()
+    doc = Document()
+    in_console_section = False
+    
+    for line in content.split('\n'):
+        if line.strip():
+            if line.strip() in ['OPENED', 'REOPENED', 'VERIFIED']:
+                p = doc.add_paragraph()
+                run = p.add_run(line)
+                run.bold = True
+                run.font.size = Pt(14)
+                if 'REOPENED' in line:
+                    run.font.color.rgb = RGBColor(255, 0, 0)
+                elif 'VERIFIED' in line:
+                    run.font.color.rgb = RGBColor(0, 128, 0)
+                in_console_section = False
+            elif line.strip().startswith('[') and line.strip().endswith(']:'):
+                p = doc.add_paragraph()
+                run = p.add_run(line)
+                run.bold = True
                 
-                if field in translations:
-                    field_translated = translations[field]
+                if '[Console Logs]:' in line:
+                    in_console_section = True
                 else:
-                    try:
-                        field_translated = translate_with_retry(parts[0].strip())
-                    except:
-                        field_translated = parts[0].strip()
+                    in_console_section = False
+            else:
+                p = doc.add_paragraph()
                 
-                if len(value) > 80:
-                    try:
-                        value_translated = translate_to_english(value)
-                    except:
-                        value_translated = value
+                # Aplicar color especial para palabras clave en el texto
+                if 'VERIFIED' in line:
+                    parts = line.split('VERIFIED')
+                    for i, part in enumerate(parts):
+                        if i > 0:
+                            run = p.add_run('VERIFIED')
+                            run.font.color.rgb = RGBColor(16, 124, 16)
+                            run.bold = True
+                        if part:
+                            run = p.add_run(part)
+                elif 'REOPENED' in line:
+                    parts = line.split('REOPENED')
+                    for i, part in enumerate(parts):
+                        if i > 0:
+                            run = p.add_run('REOPENED')
+                            run.font.color.rgb = RGBColor(204, 0, 0)
+                            run.bold = True
+                        if part:
+                            run = p.add_run(part)
                 else:
-                    if any(word in value.lower() for word in ['configurado', 'activa', 'funcionando', 'habilitado', 'deshabilitado']):
-                        try:
-                            value_translated = translate_with_retry(value)
-                        except:
-                            value_translated = value
-                    else:
-                        value_translated = value
+                    run = p.add_run(line)
                 
-                result.append(f"{field_translated}: {value_translated}")
-            else:
-                result.append(line)
+                # Aplicar formato de consola si estamos en esa sección
+                if in_console_section:
+                    for run in p.runs:
+                        run.font.name = 'Consolas'
+                        run.font.size = Pt(9)
+                        if run.font.color.rgb != RGBColor(16, 124, 16) and run.font.color.rgb != RGBColor(204, 0, 0):
+                            run.font.color.rgb = RGBColor(0, 102, 0)
         else:
-            try:
-                line_translated = translate_to_english(line)
-                result.append(line_translated)
-            except:
-                result.append(line)
+            doc.add_paragraph()
     
-    return '\n'.join(result)
+    return doc
+
+
+# Cada cuánto (ms) revisa la interfaz la cola de resultados del informe
+GENERATION_POLL_MS = 50
+# Texto de ejemplo del cuadro de logs; si sigue ahí es que no hay logs
+LOGS_PLACEHOLDER = "# Pega aquí los logs de consola (opcional)\n# No se traducirán ni corregirán\n# Ejemplo:\n# [ERROR] Connection timeout at 192.168.1.1\n# [INFO] Retry attempt 3/5..."
+# Las teclas que llegan en este intervalo se renumeran en una sola pasada
+RENUMBER_DELAY_MS = 30
+# Las barras de desplazamiento se redibujan como mucho una vez por fotograma (~60 fps)
+SCROLLBAR_FRAME_MS = 16
+# Los bloques de logs con más líneas se pliegan en el preview: se ven las primeras
+# y las últimas, y el resto se muestra a petición por páginas
+PREVIEW_FOLD_LINES = 200
+PREVIEW_FOLD_HEAD = 40
+PREVIEW_FOLD_TAIL = 20
+PREVIEW_FOLD_PAGE = 500
+
+
+def fold_lines(text, limit=PREVIEW_FOLD_LINES, head=PREVIEW_FOLD_HEAD, tail=PREVIEW_FOLD_TAIL):
+    """
+    Divide un bloque largo en (cabeza, líneas ocultas, cola); cada línea conserva
+    su salto. Devuelve None si el bloque es lo bastante corto para mostrarse entero.
+    """
+    lines = text.splitlines(keepends=True)
+    if len(lines) <= max(limit, head + tail):
+        return None
+    return ''.join(lines[:head]), lines[head:len(lines) - tail], ''.join(lines[len(lines) - tail:])
+
 
 class MaterialColors:
     PRIMARY = '#0078D4'
@@ -214,6 +2499,15 @@ class MaterialColors:
     SCROLLBAR_BG = '#F0F0F0'
     SCROLLBAR_ACTIVE = "#868686"
 
+def rounded_rect_points(x1, y1, x2, y2, radius):
+    """Vértices del polígono suavizado que dibuja un rectángulo redondeado."""
+    return [
+        x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius,
+        x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2,
+        x1, y2, x1, y2-radius, x1, y1+radius, x1, y1
+    ]
+
+
 class ModernScrollbar(tk.Canvas):
     def __init__(self, parent, orient='vertical', command=None, **kwargs):
         width = 14 if orient == 'vertical' else 200
@@ -229,6 +2523,11 @@ class ModernScrollbar(tk.Canvas):
         self.thumb_size = 0.3
         self.hover = False
         
+        # El pulgar se crea una vez y luego solo se mueve o se recolorea
+        self._thumb = None
+        self._drawn = None      # (coordenadas, color) de lo que hay en pantalla
+        self._set_job = None    # set() pendiente de dibujar en el próximo fotograma
+        
         self.bind('<Button-1>', self.on_press)
         self.bind('<B1-Motion>', self.on_drag)
         self.bind('<ButtonRelease-1>', self.on_release)
@@ -241,61 +2540,77 @@ class ModernScrollbar(tk.Canvas):
     def on_configure(self, event):
         self.draw_thumb()
     
+    def thumb_extent(self, length):
+        """Inicio y tamaño del pulgar (en píxeles) para una barra de esa longitud"""
+        thumb_length = max(30, int(length * self.thumb_size))
+        start = int((length - thumb_length) * self.thumb_pos / (1 - self.thumb_size)) if self.thumb_size < 1 else 0
+        return start, thumb_length
+    
     def draw_thumb(self):
-        self.delete('all')
-        
-        if self.thumb_size <= 0 or self.thumb_size >= 1:
-            return
-        
-        color = MaterialColors.SCROLLBAR_ACTIVE if (self.pressed or self.hover) else MaterialColors.TEXT_SECONDARY
-        
-        if self.orient == 'vertical':
-            w = int(self['width'])
-            h = self.winfo_height() if self.winfo_height() > 1 else 200
-            
-            thumb_height = max(30, int(h * self.thumb_size))
-            thumb_y = int((h - thumb_height) * self.thumb_pos / (1 - self.thumb_size)) if self.thumb_size < 1 else 0
-            
-            x1, y1 = 3, thumb_y
-            x2, y2 = w - 3, thumb_y + thumb_height
-            
-            self.create_rounded_rect(x1, y1, x2, y2, 4, fill=color, outline='')
-        else:
-            w = self.winfo_width() if self.winfo_width() > 1 else 200
-            h = int(self['height'])
-            
-            thumb_width = max(30, int(w * self.thumb_size))
-            thumb_x = int((w - thumb_width) * self.thumb_pos / (1 - self.thumb_size)) if self.thumb_size < 1 else 0
-            
-            x1, y1 = thumb_x, 3
-            x2, y2 = thumb_x + thumb_width, h - 3
+        if self.thumb_size <= 0 or self.thumb_size >= 1:
+            state = None
+        else:
+            color = MaterialColors.SCROLLBAR_ACTIVE if (self.pressed or self.hover) else MaterialColors.TEXT_SECONDARY
             
-            self.create_rounded_rect(x1, y1, x2, y2, 4, fill=color, outline='')
+            if self.orient == 'vertical':
+                w = int(self['width'])
+                h = self.winfo_height() if self.winfo_height() > 1 else 200
+                thumb_y, thumb_height = self.thumb_extent(h)
+                x1, y1 = 3, thumb_y
+                x2, y2 = w - 3, thumb_y + thumb_height
+            else:
+                w = self.winfo_width() if self.winfo_width() > 1 else 200
+                h = int(self['height'])
+                thumb_x, thumb_width = self.thumb_extent(w)
+                x1, y1 = thumb_x, 3
+                x2, y2 = thumb_x + thumb_width, h - 3
+            state = ((x1, y1, x2, y2), color)
+        
+        if state == self._drawn:
+            return
+        
+        if state is None:
+            if self._thumb is not None:
+                self.itemconfigure(self._thumb, state='hidden')
+        elif self._thumb is None:
+            self._thumb = self.create_rounded_rect(*state[0], 4, fill=state[1], outline='')
+        else:
+            self.coords(self._thumb, *rounded_rect_points(*state[0], 4))
+            self.itemconfigure(self._thumb, fill=state[1], state='normal')
+        self._drawn = state
     
     def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
-        points = [
-            x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius,
-            x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2,
-            x1, y2, x1, y2-radius, x1, y1+radius, x1, y1
-        ]
-        return self.create_polygon(points, smooth=True, **kwargs)
+        return self.create_polygon(rounded_rect_points(x1, y1, x2, y2, radius), smooth=True, **kwargs)
     
     def set(self, first, last):
         first = float(first)
         last = float(last)
+        if (first, last - first) == (self.thumb_pos, self.thumb_size):
+            return
         
         self.thumb_pos = first
         self.thumb_size = last - first
         
+        # Al desplazarse o escribir llegan muchos set() seguidos: se dibuja uno por fotograma
+        if self._set_job is None:
+            self._set_job = self.after(SCROLLBAR_FRAME_MS, self._draw_pending)
+    
+    def _draw_pending(self):
+        self._set_job = None
         self.draw_thumb()
     
+    def destroy(self):
+        if self._set_job is not None:
+            self.after_cancel(self._set_job)
+            self._set_job = None
+        super().destroy()
+    
     def on_press(self, event):
         self.pressed = True
         
         if self.orient == 'vertical':
             h = self.winfo_height()
-            thumb_height = max(30, int(h * self.thumb_size))
-            thumb_y = int((h - thumb_height) * self.thumb_pos / (1 - self.thumb_size)) if self.thumb_size < 1 else 0
+            thumb_y, thumb_height = self.thumb_extent(h)
             
             if thumb_y <= event.y <= thumb_y + thumb_height:
                 self.drag_start_y = event.y - thumb_y
@@ -306,8 +2621,7 @@ class ModernScrollbar(tk.Canvas):
                 self.drag_start_y = thumb_height / 2
         else:
             w = self.winfo_width()
-            thumb_width = max(30, int(w * self.thumb_size))
-            thumb_x = int((w - thumb_width) * self.thumb_pos / (1 - self.thumb_size)) if self.thumb_size < 1 else 0
+            thumb_x, thumb_width = self.thumb_extent(w)
             
             if thumb_x <= event.x <= thumb_x + thumb_width:
                 self.drag_start_x = event.x - thumb_x
@@ -374,26 +2688,25 @@ class RoundedButton(tk.Canvas):
         self.height = height
         self.text = text
         
-        self.draw_button(self.bg_color)
+        # Fondo y texto se crean una sola vez; al pasar el ratón solo cambia el color
+        self._color = bg_color
+        self._shape = self.create_rounded_rect(2, 2, self.width-2, self.height-2,
+                                               self.corner_radius, fill=bg_color, outline='')
+        self._label = self.create_text(self.width/2, self.height/2, text=self.text,
+                                       fill=self.fg_color, font=self.font)
         
         self.bind('<Button-1>', self.on_click)
         self.bind('<Enter>', self.on_enter)
         self.bind('<Leave>', self.on_leave)
         
     def draw_button(self, color):
-        self.delete('all')
-        self.create_rounded_rect(2, 2, self.width-2, self.height-2, 
-                                self.corner_radius, fill=color, outline='')
-        self.create_text(self.width/2, self.height/2, text=self.text,
-                        fill=self.fg_color, font=self.font)
+        if color == self._color:
+            return
+        self.itemconfigure(self._shape, fill=color)
+        self._color = color
     
     def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
-        points = [
-            x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius,
-            x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2,
-            x1, y2, x1, y2-radius, x1, y1+radius, x1, y1
-        ]
-        return self.create_polygon(points, smooth=True, **kwargs)
+        return self.create_polygon(rounded_rect_points(x1, y1, x2, y2, radius), smooth=True, **kwargs)
     
     def on_click(self, event):
         if self.command:
@@ -413,8 +2726,15 @@ class AutoNumberedText(tk.Text):
         self.bind('<Return>', self.auto_number)
         self.bind('<BackSpace>', self.handle_backspace)
         self.bind('<Delete>', self.handle_delete)
+        self.bind('<<Paste>>', self.handle_paste)
         self.configure(undo=True, maxundo=-1)
         self._renumbering = False
+        # Pasos ya analizados; siguen valiendo mientras el widget no se modifique
+        self._steps = None
+        # Renumeración pendiente: id del after, si hay que repasar todo y desde qué línea
+        self._renumber_job = None
+        self._pending_full = False
+        self._pending_from = None
     
     def auto_number(self, event):
         # Obtener la posición actual del cursor
@@ -438,7 +2758,7 @@ class AutoNumberedText(tk.Text):
         self.insert('insert', f'\n{next_num}. ')
         
         # Renumerar líneas posteriores
-        self.after(1, lambda: self.renumber_from_line(current_line_num + 2, next_num + 1))
+        self.request_renumber(current_line_num + 2, next_num + 1)
         
         return 'break'
     
@@ -451,7 +2771,7 @@ class AutoNumberedText(tk.Text):
             # Obtener la selección actual
             if self.tag_ranges("sel"):
                 # Si hay texto seleccionado, programar renumeración después del borrado
-                self.after(1, self.renumber_all_lines)
+                self.request_renumber()
                 return None
             
             # Obtener posición actual
@@ -469,14 +2789,14 @@ class AutoNumberedText(tk.Text):
                 match_current = re.match(r'^\d+\.\s*(.*)$', current_line)
                 if match_current and match_current.group(1).strip():
                     # Programar renumeración después de la unión
-                    self.after(1, self.renumber_all_lines)
+                    self.request_renumber()
             else:
                 # Obtener contenido de la línea actual
                 line_content = self.get(f"{current_line_num}.0", f"{current_line_num}.end")
                 
                 # Si después del backspace la línea quedará vacía o solo con número
                 if len(line_content.strip()) <= 3:  # "X. " o menos
-                    self.after(1, self.renumber_all_lines)
+                    self.request_renumber()
         except:
             pass
         
@@ -490,7 +2810,7 @@ class AutoNumberedText(tk.Text):
         try:
             # Si hay selección, programar renumeración
             if self.tag_ranges("sel"):
-                self.after(1, self.renumber_all_lines)
+                self.request_renumber()
                 return None
             
             # Obtener posición actual
@@ -501,113 +2821,133 @@ class AutoNumberedText(tk.Text):
             
             # Si estamos al final de la línea, se unirá con la siguiente
             if current_col >= len(line_content):
-                self.after(1, self.renumber_all_lines)
+                self.request_renumber()
             else:
                 # Si la línea quedará vacía después del delete
                 if len(line_content.strip()) <= 3:
-                    self.after(1, self.renumber_all_lines)
+                    self.request_renumber()
         except:
             pass
         
         return None
     
-    def renumber_from_line(self, start_line, start_num):
-        """Renumera las líneas desde start_line con numeración consecutiva"""
+    def request_renumber(self, start_line=None, start_num=None):
+        """Programa una renumeración; las peticiones seguidas se juntan en una sola pasada.
+
+        Sin start_line se renumera todo el documento; si no, desde esa línea.
+        """
+        if start_line is None:
+            self._pending_full = True
+        elif self._pending_from is None or start_line < self._pending_from[0]:
+            self._pending_from = (start_line, start_num)
+        if self._renumber_job is None:
+            self._renumber_job = self.after(RENUMBER_DELAY_MS, self._run_pending_renumber)
+    
+    def _run_pending_renumber(self):
+        self._renumber_job = None
+        full, pending_from = self._pending_full, self._pending_from
+        self._pending_full = False
+        self._pending_from = None
+        if full:
+            self.renumber_all_lines()
+        elif pending_from:
+            self.renumber_from_line(*pending_from)
+    
+    def _renumber(self, start_line, start_num, clear_empty):
+        """Lee el texto una vez y toca solo los prefijos de las líneas cuyo número cambia"""
         if self._renumbering:
             return
         
         self._renumbering = True
         try:
-            total_lines = int(self.index('end-1c').split('.')[0])
-            current_num = start_num
+            lines = self.get(f"{start_line}.0", 'end-1c').split('\n')
+            edits = renumber_edits(lines, start_num, clear_empty)
+            if not edits:
+                return
             
-            for line_num in range(start_line, total_lines + 1):
-                line_content = self.get(f"{line_num}.0", f"{line_num}.end")
-                
-                # Si la línea tiene numeración, actualizarla
-                match = re.match(r'^\d+\.\s*(.*)$', line_content)
-                if match:
-                    rest_of_line = match.group(1)
-                    if rest_of_line.strip():  # Solo si hay contenido
-                        self.delete(f"{line_num}.0", f"{line_num}.end")
-                        self.insert(f"{line_num}.0", f"{current_num}. {rest_of_line}")
-                        current_num += 1
+            # Toda la pasada es un único paso de deshacer; como solo cambian los
+            # prefijos, el cursor y el resto de cada línea se quedan donde estaban
+            autoseparators = self.cget('autoseparators')
+            self.configure(autoseparators=False)
+            self.edit_separator()
+            try:
+                for index, old_length, prefix in edits:
+                    line_num = start_line + index
+                    self.delete(f"{line_num}.0", f"{line_num}.{old_length}")
+                    if prefix:
+                        self.insert(f"{line_num}.0", prefix)
+            finally:
+                self.edit_separator()
+                self.configure(autoseparators=autoseparators)
+        except tk.TclError:
+            pass
         finally:
             self._renumbering = False
     
+    def renumber_from_line(self, start_line, start_num):
+        """Renumera las líneas desde start_line con numeración consecutiva"""
+        self._renumber(start_line, start_num, clear_empty=False)
+    
     def renumber_all_lines(self):
         """Renumera TODAS las líneas del documento manteniendo orden consecutivo"""
-        if self._renumbering:
-            return
+        self._renumber(1, 1, clear_empty=True)
+    
+    def handle_paste(self, event):
+        """Pega varias líneas de golpe: numera todo el texto en una pasada"""
+        try:
+            pasted = self.clipboard_get()
+        except tk.TclError:
+            return None
+        if '\n' not in pasted.strip():
+            return None
         
-        self._renumbering = True
+        if self.tag_ranges('sel'):
+            start, end = self.index('sel.first'), self.index('sel.last')
+        else:
+            start = end = self.index('insert')
+        before = self.get('1.0', start) + pasted
+        after = self.get(end, 'end-1c')
+        
+        steps_before = parse_steps(before)
+        steps = parse_steps(before + after)
+        self.set_steps(steps)
+        # Cursor al final del último paso pegado
+        if steps_before:
+            self.mark_set('insert', f"{len(steps_before)}.end")
+        self.see('insert')
+        return 'break'
+    
+    def set_steps(self, steps):
+        """Sustituye el contenido por la lista de pasos (un solo paso de deshacer)"""
+        steps = list(steps)
+        if self._renumber_job is not None:
+            self.after_cancel(self._renumber_job)
+            self._renumber_job = None
+            self._pending_full = False
+            self._pending_from = None
+        
+        autoseparators = self.cget('autoseparators')
+        self.configure(autoseparators=False)
+        self.edit_separator()
         try:
-            # Guardar posición del cursor
-            try:
-                cursor_pos = self.index('insert')
-                cursor_line = int(cursor_pos.split('.')[0])
-                cursor_col = int(cursor_pos.split('.')[1])
-            except:
-                cursor_pos = '1.0'
-                cursor_line = 1
-                cursor_col = 0
-            
-            content = self.get('1.0', 'end-1c')
-            lines = content.split('\n')
-            
-            current_num = 1
-            line_number_changes = {}  # Mapeo de número viejo a nuevo
-            
-            for line_idx, line in enumerate(lines):
-                line_num = line_idx + 1
-                
-                # Si la línea tiene numeración
-                match = re.match(r'^(\d+)\.\s*(.*)$', line)
-                if match:
-                    old_num = int(match.group(1))
-                    rest_of_line = match.group(2).strip()
-                    
-                    if rest_of_line:  # Solo si hay contenido después del número
-                        line_number_changes[old_num] = current_num
-                        expected_text = f"{current_num}. {rest_of_line}"
-                        current_text = self.get(f"{line_num}.0", f"{line_num}.end")
-                        
-                        # Solo actualizar si cambió
-                        if current_text != expected_text:
-                            self.delete(f"{line_num}.0", f"{line_num}.end")
-                            self.insert(f"{line_num}.0", expected_text)
-                        
-                        current_num += 1
-                    else:
-                        # Línea con solo número, eliminarla
-                        self.delete(f"{line_num}.0", f"{line_num}.end")
-            
-            # Restaurar posición del cursor de manera inteligente
-            try:
-                new_cursor_pos = f"{cursor_line}.{cursor_col}"
-                self.mark_set('insert', new_cursor_pos)
-            except:
-                try:
-                    self.mark_set('insert', '1.0')
-                except:
-                    pass
-                    
-        except Exception as e:
-            pass
+            self.delete('1.0', 'end')
+            self.insert('1.0', format_steps(steps) if steps else '1. ')
         finally:
-            self._renumbering = False
+            self.edit_separator()
+            self.configure(autoseparators=autoseparators)
+        self.mark_set('insert', 'end-1c')
+        self._steps = steps
+        self.edit_modified(False)
+    
+    def get_steps(self):
+        """Lista de pasos sin numerar; solo se vuelve a analizar si el texto cambió"""
+        if self._steps is None or self.tk.getboolean(self.edit_modified()):
+            self._steps = parse_steps(self.get('1.0', 'end-1c'))
+            self.edit_modified(False)
+        return self._steps
     
     def get_numbered_text(self):
-        content = self.get('1.0', 'end-1c')
-        lines = content.split('\n')
-        clean = []
-        counter = 1
-        for line in lines:
-            clean_line = re.sub(r'^\d+\.\s*', '', line).strip()
-            if clean_line:
-                clean.append(f"{counter}. {clean_line}")
-                counter += 1
-        return '\n'.join(clean)
+        return format_steps(self.get_steps())
     
 class RepairReportGenerator:
     def __init__(self, root):
@@ -624,6 +2964,21 @@ class RepairReportGenerator:
         self.expected_widgets = []
         self.always_visible_widgets = []
         
+        # Estado del informe que se está generando en segundo plano
+        self._generation = None
+        # Última traducción de cada sección: (clave, idioma) -> (huella de la entrada, texto)
+        self._section_results = {}
+        # Estructura y layout del informe que muestra el preview (None si no hay informe)
+        self._preview_structure = None
+        self._preview_layout = None
+        # Idioma que muestra el preview
+        self._shown_language = 'en'
+        # Ventana del panel de diagnóstico (se crea al abrirla)
+        self._diagnostics = None
+        # Bloques plegados del preview: nombre -> {'lines': ocultas, 'next': primera sin mostrar}
+        self._folds = OrderedDict()
+        self._fold_serial = 0
+        
         self.create_widgets()
 
     def setup_modern_style(self):
@@ -642,6 +2997,14 @@ class RepairReportGenerator:
                  fieldbackground=[('readonly', 'white')],
                  selectbackground=[('readonly', MaterialColors.PRIMARY)],
                  selectforeground=[('readonly', 'white')])
+        
+        style.configure('Modern.Horizontal.TProgressbar',
+                       troughcolor=MaterialColors.SCROLLBAR_BG,
+                       background=MaterialColors.SUCCESS,
+                       bordercolor=MaterialColors.BORDER_LIGHT,
+                       lightcolor=MaterialColors.SUCCESS,
+                       darkcolor=MaterialColors.SUCCESS,
+                       thickness=8)
     
     def create_rounded_frame(self, parent, **kwargs):
         frame = tk.Frame(parent, **kwargs)
@@ -704,6 +3067,28 @@ class RepairReportGenerator:
         self.report_type.pack(fill=tk.X)
         self.report_type.current(0)
         self.report_type.bind('<<ComboboxSelected>>', self.on_type_change)
+        
+        # Idiomas adicionales: el informe en inglés se genera siempre
+        languages_frame = tk.Frame(combo_frame, bg=MaterialColors.BG_LIGHT)
+        languages_frame.pack(fill=tk.X, pady=(10, 0))
+        tk.Label(languages_frame, text="Generar también en:", font=('Segoe UI', 10),
+                bg=MaterialColors.BG_LIGHT, fg=MaterialColors.TEXT_SECONDARY).pack(side=tk.LEFT)
+        self.extra_languages = {}
+        for code, name in LANGUAGES.items():
+            if code == 'en':
+                continue
+            var = tk.BooleanVar(value=False)
+            tk.Checkbutton(languages_frame, text=name, variable=var, font=('Segoe UI', 10),
+                           bg=MaterialColors.BG_LIGHT, activebackground=MaterialColors.BG_LIGHT,
+                           relief=tk.FLAT, highlightthickness=0).pack(side=tk.LEFT, padx=(8, 0))
+            self.extra_languages[code] = var
+        
+        self.streaming_preview = tk.BooleanVar(value=True)
+        tk.Checkbutton(combo_frame, text="Mostrar la traducción en el preview según llega",
+                       variable=self.streaming_preview, font=('Segoe UI', 10),
+                       bg=MaterialColors.BG_LIGHT, activebackground=MaterialColors.BG_LIGHT,
+                       fg=MaterialColors.TEXT_SECONDARY, relief=tk.FLAT,
+                       highlightthickness=0).pack(anchor='w', pady=(6, 0))
         row_counter += 1
         
         summary_card = self.add_section("Summary", row_counter, icon="")
@@ -760,7 +3145,7 @@ class RepairReportGenerator:
         row_counter += 1
         
         logs_frame = self.create_rounded_frame(self.form_frame, bg='#2b2b2b')
-        logs_frame.grid(row=row_counter, column=0, sticky='ew', padx=30, pady=(0, 25))
+        logs_frame.grid(row=row_counter, column=0, sticky='ew', padx=30, pady=(0, 10))
         self.always_visible_widgets.append(logs_frame)
         
         logs_text_frame = tk.Frame(logs_frame, bg='#2b2b2b')
@@ -786,23 +3171,57 @@ class RepairReportGenerator:
         self.console_logs.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         logs_scroll.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 5), pady=10)
         
-        placeholder_logs = "# Pega aquí los logs de consola (opcional)\n# No se traducirán ni corregirán\n# Ejemplo:\n# [ERROR] Connection timeout at 192.168.1.1\n# [INFO] Retry attempt 3/5..."
-        self.console_logs.insert('1.0', placeholder_logs)
+        self.console_logs.insert('1.0', LOGS_PLACEHOLDER)
         self.console_logs.config(fg='#666666')
         
         def on_logs_focus_in(event):
-            if self.console_logs.get('1.0', 'end-1c') == placeholder_logs:
+            if self.console_logs.get('1.0', 'end-1c') == LOGS_PLACEHOLDER:
                 self.console_logs.delete('1.0', tk.END)
                 self.console_logs.config(fg='#00ff00')
         
         def on_logs_focus_out(event):
             if not self.console_logs.get('1.0', 'end-1c').strip():
-                self.console_logs.insert('1.0', placeholder_logs)
+                self.console_logs.insert('1.0', LOGS_PLACEHOLDER)
                 self.console_logs.config(fg='#666666')
         
         self.console_logs.bind('<FocusIn>', on_logs_focus_in)
         self.console_logs.bind('<FocusOut>', on_logs_focus_out)
         row_counter += 1
+        
+        # Fichero de log: solo se carga un extracto (primeras/últimas líneas filtradas)
+        log_file_frame = tk.Frame(self.form_frame, bg=MaterialColors.BG_LIGHT)
+        log_file_frame.grid(row=row_counter, column=0, sticky='w', padx=30, pady=(0, 25))
+        self.always_visible_widgets.append(log_file_frame)
+        
+        log_btn = RoundedButton(log_file_frame, text="Adjuntar log...",
+                               command=self.attach_log_file,
+                               bg_color=MaterialColors.TEXT_SECONDARY,
+                               hover_color='#525252',
+                               width=130, height=36, corner_radius=6)
+        log_btn.pack(side=tk.LEFT)
+        
+        self.log_head = tk.IntVar(value=LOG_HEAD_LINES)
+        self.log_tail = tk.IntVar(value=LOG_TAIL_LINES)
+        for label, var in (("Primeras", self.log_head), ("Últimas", self.log_tail)):
+            tk.Label(log_file_frame, text=label, font=('Segoe UI', 10),
+                    bg=MaterialColors.BG_LIGHT, fg=MaterialColors.TEXT_SECONDARY).pack(side=tk.LEFT, padx=(12, 4))
+            tk.Spinbox(log_file_frame, from_=0, to=100000, increment=50, width=6,
+                       textvariable=var, font=('Segoe UI', 10)).pack(side=tk.LEFT)
+        
+        tk.Label(log_file_frame, text="Niveles", font=('Segoe UI', 10),
+                bg=MaterialColors.BG_LIGHT, fg=MaterialColors.TEXT_SECONDARY).pack(side=tk.LEFT, padx=(12, 4))
+        self.log_levels = ttk.Combobox(log_file_frame,
+                                       values=["Todos", "ERROR", "ERROR, WARN", "ERROR, WARN, INFO"],
+                                       state='readonly', width=16, font=('Segoe UI', 10),
+                                       style='Modern.TCombobox')
+        self.log_levels.pack(side=tk.LEFT)
+        self.log_levels.current(0)
+        
+        tk.Label(log_file_frame, text="Filtro", font=('Segoe UI', 10),
+                bg=MaterialColors.BG_LIGHT, fg=MaterialColors.TEXT_SECONDARY).pack(side=tk.LEFT, padx=(12, 4))
+        self.log_filter = tk.Entry(log_file_frame, font=('Segoe UI', 10), width=18, relief=tk.FLAT)
+        self.log_filter.pack(side=tk.LEFT, ipady=3)
+        row_counter += 1
         # =====================================
 
         proc_card = self.add_section("Procedimiento", row_counter, icon="")
@@ -835,7 +3254,14 @@ class RepairReportGenerator:
                                 bg_color=MaterialColors.TEXT_SECONDARY,
                                 hover_color='#525252',
                                 width=120, height=36, corner_radius=6)
-        proc_btn.pack()
+        proc_btn.pack(side=tk.LEFT)
+        
+        import_btn = RoundedButton(btn_reset_container, text="Importar...",
+                                  command=self.import_procedure,
+                                  bg_color=MaterialColors.TEXT_SECONDARY,
+                                  hover_color='#525252',
+                                  width=120, height=36, corner_radius=6)
+        import_btn.pack(side=tk.LEFT, padx=(8, 0))
         self.procedure_widgets.append(btn_reset_container)
         row_counter += 1
         
@@ -887,6 +3313,13 @@ class RepairReportGenerator:
                                     width=180, height=48)
         btn_generate.pack(side=tk.LEFT, padx=8)
         
+        btn_cancel = RoundedButton(btn_frame, text="Cancelar", 
+                                  command=self.cancel_generation,
+                                  bg_color=MaterialColors.TEXT_SECONDARY,
+                                  hover_color='#525252',
+                                  width=140, height=45)
+        btn_cancel.pack(side=tk.LEFT, padx=8)
+        
         self.form_frame.columnconfigure(0, weight=1)
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -936,6 +3369,13 @@ class RepairReportGenerator:
         tk.Label(preview_header, text="Vista Previa", font=('Segoe UI', 15, 'bold'),
                 bg=MaterialColors.SUCCESS, fg='white').pack(pady=12)
         
+        # Idioma que muestra el preview (y que se copia o exporta)
+        self.preview_language = ttk.Combobox(preview_header, state='readonly', width=14,
+                                             font=('Segoe UI', 10), style='Modern.TCombobox')
+        self._set_preview_languages(('en',))
+        self.preview_language.place(relx=1.0, rely=0.5, x=-15, anchor='e')
+        self.preview_language.bind('<<ComboboxSelected>>', self.on_preview_language_change)
+        
         preview_container = tk.Frame(preview_card, bg='white')
         preview_container.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
@@ -956,8 +3396,19 @@ class RepairReportGenerator:
                            "Se traducirá automáticamente al inglés\n    "
                            "Se corregirán errores gramaticales\n\n ")
         
+        # Indicador de progreso, visible solo mientras se genera el informe
+        self.progress_frame = tk.Frame(preview_card, bg='white')
+        self.progress_label = tk.Label(self.progress_frame, text="", font=('Segoe UI', 9),
+                                       bg='white', fg=MaterialColors.TEXT_SECONDARY, anchor='w')
+        self.progress_label.pack(fill=tk.X)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient=tk.HORIZONTAL,
+                                            mode='determinate',
+                                            style='Modern.Horizontal.TProgressbar')
+        self.progress_bar.pack(fill=tk.X, pady=(4, 0))
+        
         btn_preview = tk.Frame(preview_card, bg='white')
         btn_preview.pack(fill=tk.X, padx=15, pady=15)
+        self.preview_buttons = btn_preview
         
         left_btns = tk.Frame(btn_preview, bg='white')
         left_btns.pack(side=tk.LEFT)
@@ -979,12 +3430,19 @@ class RepairReportGenerator:
         right_btns = tk.Frame(btn_preview, bg='white')
         right_btns.pack(side=tk.RIGHT)
         
+        btn_diagnostics = RoundedButton(right_btns, text="Diagnóstico", 
+                                       command=self.open_diagnostics,
+                                       bg_color=MaterialColors.TEXT_SECONDARY,
+                                       hover_color='#525252',
+                                       width=120, height=38)
+        btn_diagnostics.pack(side=tk.LEFT, padx=(0, 5))
+        
         btn_clear_prev = RoundedButton(right_btns, text="Limpiar", 
                                       command=self.clear_preview,
                                       bg_color=MaterialColors.TEXT_SECONDARY,
                                       hover_color='#525252',
                                       width=110, height=38)
-        btn_clear_prev.pack()
+        btn_clear_prev.pack(side=tk.LEFT, padx=(5, 0))
         
         main_paned.add(left_container, minsize=600)
         main_paned.add(right_container, minsize=400)
@@ -1102,14 +3560,96 @@ class RepairReportGenerator:
         self.procedure.delete('1.0', tk.END)
         self.procedure.insert('1.0', '1. ')
     
+    def import_procedure(self):
+        path = filedialog.askopenfilename(title="Importar pasos", filetypes=STEP_FILE_TYPES)
+        if not path:
+            return
+        try:
+            steps = read_steps_file(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudieron leer los pasos:\n{e}")
+            return
+        if not steps:
+            messagebox.showwarning("Importar pasos", "El fichero no contiene pasos")
+            return
+        
+        current = self.procedure.get_steps()
+        if current and not messagebox.askyesno(
+                "Importar pasos",
+                f"Se sustituirán los {len(current)} pasos actuales por los {len(steps)} "
+                f"del fichero. ¿Continuar?"):
+            return
+        self.procedure.set_steps(steps)
+        self.procedure.see('1.0')
+    
+    def attach_log_file(self):
+        """Añade a los logs un extracto acotado de un fichero y lo cita en Attachments."""
+        path = filedialog.askopenfilename(title="Adjuntar fichero de log", filetypes=LOG_FILE_TYPES)
+        if not path:
+            return
+        try:
+            head = max(0, int(self.log_head.get()))
+            tail = max(0, int(self.log_tail.get()))
+            levels = self.log_levels.get().split(', ') if self.log_levels.current() > 0 else None
+            pattern = self.log_filter.get().strip() or None
+            log_line_filter(levels, pattern)
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Opciones del log no válidas:\n{e}")
+            return
+        
+        # La lectura de un log grande no debe bloquear la ventana
+        results = queue.Queue()
+        
+        def read():
+            try:
+                results.put(('ok', read_log_excerpt(path, head, tail, levels, pattern)))
+            except Exception as e:
+                results.put(('error', str(e)))
+        
+        threading.Thread(target=read, daemon=True).start()
+        self.root.configure(cursor='watch')
+        self.root.after(GENERATION_POLL_MS, self._poll_log_file, results)
+    
+    def _poll_log_file(self, results):
+        try:
+            kind, payload = results.get_nowait()
+        except queue.Empty:
+            self.root.after(GENERATION_POLL_MS, self._poll_log_file, results)
+            return
+        
+        self.root.configure(cursor='')
+        if kind == 'error':
+            messagebox.showerror("Error", f"No se pudo leer el log:\n{payload}")
+            return
+        
+        excerpt, stats = payload
+        current = self.console_logs.get('1.0', 'end-1c').strip()
+        if current == LOGS_PLACEHOLDER:
+            # Sustituye al texto de ejemplo
+            self.console_logs.delete('1.0', tk.END)
+            self.console_logs.config(fg='#00ff00')
+            current = ''
+        self.console_logs.insert(tk.END, ("\n\n" if current else "") + excerpt)
+        
+        attachments = add_attachment(self.attachments.get(), stats['file'])
+        self.attachments.delete(0, tk.END)
+        self.attachments.insert(0, attachments)
+        
+        if stats['lines'] is None:
+            detail = f"Se han cargado las últimas {stats['shown']} líneas"
+        else:
+            detail = (f"Se han cargado {stats['shown']} de {stats['matched']} líneas "
+                      f"({stats['lines']} en el fichero)")
+        messagebox.showinfo("Log adjuntado",
+                            f"{detail}.\n{stats['file']} se ha añadido a Attachments.")
+    
     def clear_form(self):
         self.summary.delete(0, tk.END)
         self.equipment.delete('1.0', tk.END)
         self.description.delete('1.0', tk.END)
         
-        placeholder_logs = "# Pega aquí los logs de consola (opcional)\n# No se traducirán ni corregirán\n# Ejemplo:\n# [ERROR] Connection timeout at 192.168.1.1\n# [INFO] Retry attempt 3/5..."
         self.console_logs.delete('1.0', tk.END)
-        self.console_logs.insert('1.0', placeholder_logs)
+        self.console_logs.insert('1.0', LOGS_PLACEHOLDER)
         self.console_logs.config(fg='#666666')
         
         self.procedure.delete('1.0', tk.END)
@@ -1120,7 +3660,7 @@ class RepairReportGenerator:
         self.on_type_change()
     
     def copy_preview(self):
-        content = self.preview.get('1.0', 'end-1c')
+        content = self.preview_text()
         if not content.strip() or "Vista Previa" in content:
             messagebox.showwarning("Advertencia", "Genera primero un informe")
             return
@@ -1129,264 +3669,800 @@ class RepairReportGenerator:
         messagebox.showinfo("Copiado", "Informe copiado al portapapeles")
     
     def clear_preview(self):
+        self.cancel_generation()
+        self._preview_structure = None
+        self._preview_layout = None
         self.preview.delete('1.0', tk.END)
+        self._clear_preview_folds()
         self.preview.insert('1.0', "\n\n    Vista Previa del Informe\n\n    "
                            "Completa el formulario y haz clic en Generar\n\n    "
                            "Se traducirá automáticamente al inglés\n    "
                            "Se corregirán errores gramaticales\n\n ")
     
     def export_word(self):
-        content = self.preview.get('1.0', 'end-1c').strip()
+        content = self.preview_text().strip()
         if not content or "Vista Previa" in content:
             messagebox.showwarning("Advertencia", "Genera primero un informe")
             return
         
         try:
-            doc = Document()
-            in_console_section = False
-            
-            for line in content.split('\n'):
-                if line.strip():
-                    if line.strip() in ['OPENED', 'REOPENED', 'VERIFIED']:
-                        p = doc.add_paragraph()
-                        run = p.add_run(line)
-                        run.bold = True
-                        run.font.size = Pt(14)
-                        if 'REOPENED' in line:
-                            run.font.color.rgb = RGBColor(255, 0, 0)
-                        elif 'VERIFIED' in line:
-                            run.font.color.rgb = RGBColor(0, 128, 0)
-                        in_console_section = False
-                    elif line.strip().startswith('[') and line.strip().endswith(']:'):
-                        p = doc.add_paragraph()
-                        run = p.add_run(line)
-                        run.bold = True
-                        
-                        if '[Console Logs]:' in line:
-                            in_console_section = True
-                        else:
-                            in_console_section = False
-                    else:
-                        p = doc.add_paragraph()
-                        
-                        # Aplicar color especial para palabras clave en el texto
-                        if 'VERIFIED' in line:
-                            parts = line.split('VERIFIED')
-                            for i, part in enumerate(parts):
-                                if i > 0:
-                                    run = p.add_run('VERIFIED')
-                                    run.font.color.rgb = RGBColor(16, 124, 16)
-                                    run.bold = True
-                                if part:
-                                    run = p.add_run(part)
-                        elif 'REOPENED' in line:
-                            parts = line.split('REOPENED')
-                            for i, part in enumerate(parts):
-                                if i > 0:
-                                    run = p.add_run('REOPENED')
-                                    run.font.color.rgb = RGBColor(204, 0, 0)
-                                    run.bold = True
-                                if part:
-                                    run = p.add_run(part)
-                        else:
-                            run = p.add_run(line)
-                        
-                        # Aplicar formato de consola si estamos en esa sección
-                        if in_console_section:
-                            for run in p.runs:
-                                run.font.name = 'Consolas'
-                                run.font.size = Pt(9)
-                                if run.font.color.rgb != RGBColor(16, 124, 16) and run.font.color.rgb != RGBColor(204, 0, 0):
-                                    run.font.color.rgb = RGBColor(0, 102, 0)
-                else:
-                    doc.add_paragraph()
+            with tracer.span('export_word.build', chars=len(content)):
+                doc = build_word_document(content)
             
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Se exporta el idioma que muestra el preview
+            language = self.selected_preview_language()
+            suffix = '' if language == 'en' else f"_{language}"
             path = filedialog.asksaveasfilename(
                 defaultextension=".docx",
                 filetypes=[("Word", "*.docx")],
-                initialfile=f"Repair_{self.report_type.get()}_{ts}.docx"
+                initialfile=f"Repair_{self.report_type.get()}_{ts}{suffix}.docx"
             )
             if path:
-                doc.save(path)
+                with tracer.span('export_word.save'):
+                    doc.save(path)
                 messagebox.showinfo("Exportado", f"Documento guardado en:\n{path}")
         except Exception as e:
             messagebox.showerror("Error", str(e))
     
+    def collect_fields(self):
+        """Lee el formulario (solo desde el hilo de Tk)."""
+        logs = self.console_logs.get('1.0', tk.END).strip()
+        return {
+            'summary': self.summary.get().strip(),
+            'equipment': self.equipment.get('1.0', tk.END).strip(),
+            'description': self.description.get('1.0', tk.END).strip(),
+            'logs': '' if logs == LOGS_PLACEHOLDER else logs,
+            'procedure': self.procedure.get_numbered_text(),
+            'expected': self.expected.get('1.0', tk.END).strip(),
+            'attachments': self.attachments.get().strip(),
+        }
+    
     def generate(self):
+        # Ignorar Generar/Ctrl+S mientras haya un informe en curso
+        if self._generation is not None:
+            return
+        
         self.root.focus_set()
-        self.root.update_idletasks()
         
-        rt = self.report_type.get()
+        # La traza del panel de diagnóstico corresponde al último informe
+        tracer.clear()
+        started = time.perf_counter()
         
-        if rt == "OPENED":
-            if not self.summary.get().strip():
-                messagebox.showerror("Error", "Summary obligatorio para OPENED")
-                return
-            proc = self.procedure.get_numbered_text()
-            if not proc.strip() or proc.strip() == "1.":
-                messagebox.showerror("Error", "Procedimiento obligatorio para OPENED")
-                return
-            if not self.expected.get('1.0', tk.END).strip():
-                messagebox.showerror("Error", "Resultado Esperado obligatorio para OPENED")
-                return
+        rt = self.report_type.get()
+        fields = self.collect_fields()
         
-        if not self.equipment.get('1.0', tk.END).strip():
-            messagebox.showerror("Error", "Equipment Information requerido")
-            return
-        if not self.description.get('1.0', tk.END).strip():
-            messagebox.showerror("Error", "Descripcion requerida")
+        error = validate_report_fields(rt, fields)
+        if error:
+            messagebox.showerror("Error", error)
             return
         
+        targets = self.selected_languages()
+        self._set_preview_languages(targets)
+        shown = self.selected_preview_language()
+        
         try:
-            self.preview.delete('1.0', tk.END)
-            
-            # Configurar tags de formato
-            self.preview.tag_config("verified_word", foreground='#107C10', font=('Consolas', 10, 'bold'))
-            self.preview.tag_config("reopened_word", foreground='#CC0000', font=('Consolas', 10, 'bold'))
-            self.preview.tag_config("console_logs", font=('Consolas', 9), foreground='#006600', background='#f0f0f0')
+            layout = build_report_layout(rt, fields)
             
-            if rt == "VERIFIED":
-                self.preview.insert(tk.END, "Traduciendo...\n")
-                self.preview.see(tk.END)
-                self.root.update()
-                
-                eq = translate_equipment_info(self.equipment.get('1.0', tk.END).strip())
-                self.preview.delete("end-2l", "end-1l")
-                self.preview.insert(tk.END, "[Equipment information]:\n")
-                self.preview.insert(tk.END, f"{eq}\n\n")
-                self.root.update()
-                
-                # Insertar "VERIFIED" con color verde
-                verified_text = "The problem is VERIFIED in this version\n\n"
-                start = self.preview.index("end-1c")
-                self.preview.insert(tk.END, verified_text)
-                
-                # Aplicar tag solo a la palabra VERIFIED
-                verified_start = f"{start} + {verified_text.index('VERIFIED')}c"
-                verified_end = f"{verified_start} + 8c"
-                self.preview.tag_add("verified_word", verified_start, verified_end)
-                self.root.update()
-                
-                self.preview.insert(tk.END, "Traduciendo descripcion...\n")
-                self.preview.see(tk.END)
-                self.root.update()
-                
-                desc = translate_and_correct(self.description.get('1.0', tk.END).strip())
-                self.preview.delete("end-2l", "end-1l")
-                self.preview.insert(tk.END, f"{desc}\n\n")
-                self.root.update()
-                
-                logs = self.console_logs.get('1.0', tk.END).strip()
-                
-                if logs and not logs.startswith("#"):
-                    self.preview.insert(tk.END, "[Console Logs]:\n")
-                    start_idx = self.preview.index("end-1c")
-                    self.preview.insert(tk.END, f"{logs}\n\n")
-                    end_idx = self.preview.index("end-1c")
-                    
-                    self.preview.tag_add("console_logs", start_idx, end_idx)
-                    self.root.update()
-                
-                att = self.attachments.get().strip()
-                if att:
-                    self.preview.insert(tk.END, "[Attachments]:\n")
-                    self.preview.insert(tk.END, f"{att}\n")
-                
-                messagebox.showinfo("Listo", "Informe generado correctamente")
-                return
+            # Solo se traducen las secciones (en cada idioma) cuya entrada
+            # cambió desde el último informe
+            fingerprints = {}
+            sections = []
+            reused = 0
+            for kind, key, source in layout:
+                if kind != 'section':
+                    continue
+                fingerprints[key] = section_fingerprint(key, source)
+                for target in targets:
+                    previous = self._section_results.get((key, target))
+                    if previous and previous[0] == fingerprints[key]:
+                        reused += 1
+                    else:
+                        sections.append((key, source, target))
+            known = self._known_sections(layout, shown)
             
-            self.preview.insert(tk.END, f"{rt}\n")
-            if rt == "REOPENED":
-                reopened_text = "The problem continues, REOPENED in this version.\n\n"
-                start = self.preview.index("end-1c")
-                self.preview.insert(tk.END, reopened_text)
-                
-                # Aplicar tag solo a la palabra REOPENED
-                reopened_start = f"{start} + {reopened_text.index('REOPENED')}c"
-                reopened_end = f"{reopened_start} + 8c"
-                self.preview.tag_add("reopened_word", reopened_start, reopened_end)
+            structure = report_structure(layout)
+            with tracer.span('ui.render', reused=reused):
+                if structure == self._preview_structure:
+                    for key, _, target in sections:
+                        if target == shown:
+                            self.replace_preview_section(key, "Traduciendo...")
+                    # Las secciones reutilizadas pueden mostrar otra cosa (una
+                    # traducción cancelada o el texto editado a mano en el preview)
+                    for key, text in known.items():
+                        current = self.preview.get(f"section_{key}_start", f"section_{key}_end")
+                        if current != text:
+                            self.replace_preview_section(key, text)
+                else:
+                    self.render_preview_skeleton(layout, known)
+                    self._preview_structure = structure
+            self._preview_layout = layout
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        
+        if not sections:
+            tracer.add_span('generate', started, time.perf_counter(),
+                            report_type=rt, sections=0, result='sin cambios')
+            messagebox.showinfo("Listo", "Informe generado correctamente")
+            return
+        
+        results = queue.Queue()
+        cancel = threading.Event()
+        self._generation = {'queue': results, 'cancel': cancel,
+                            'total': len(sections), 'done': 0,
+                            'fingerprints': fingerprints,
+                            # Texto ya mostrado de cada sección que se va traduciendo por trozos
+                            'streamed': {},
+                            'started': started, 'report_type': rt}
+        
+        self.progress_bar.configure(maximum=len(sections), value=0)
+        self.progress_label.config(text=f"Traduciendo 0/{len(sections)} secciones...")
+        self.progress_frame.pack(fill=tk.X, padx=15, pady=(10, 0), before=self.preview_buttons)
+        
+        worker = threading.Thread(target=self._generation_worker,
+                                  args=(sections, results, cancel, self.streaming_preview.get()),
+                                  daemon=True)
+        worker.start()
+        self.root.after(GENERATION_POLL_MS, self._poll_generation)
+    
+    def selected_languages(self):
+        """Idiomas a generar: inglés y los marcados en el formulario."""
+        return ('en',) + tuple(code for code, var in self.extra_languages.items() if var.get())
+    
+    def _set_preview_languages(self, targets):
+        self._preview_languages = list(targets)
+        self.preview_language.configure(values=[f"{LANGUAGES[code]} ({code})" for code in targets])
+        self.preview_language.current(targets.index(self._shown_language)
+                                      if self._shown_language in targets else 0)
+        if self.selected_preview_language() != self._shown_language:
+            # El idioma que se veía ya no se genera: hay que redibujar el preview
+            self._shown_language = self.selected_preview_language()
+            self._preview_structure = None
+    
+    def selected_preview_language(self):
+        index = self.preview_language.current()
+        return self._preview_languages[index] if index >= 0 else 'en'
+    
+    def _known_sections(self, layout, target):
+        """Traducciones vigentes de las secciones del layout en un idioma."""
+        known = {}
+        for kind, key, source in layout:
+            if kind != 'section':
+                continue
+            previous = self._section_results.get((key, target))
+            if previous and previous[0] == section_fingerprint(key, source):
+                known[key] = previous[1]
+        return known
+    
+    def on_preview_language_change(self, event=None):
+        """Muestra en el preview el informe en el idioma elegido."""
+        self._shown_language = self.selected_preview_language()
+        if self._preview_layout is None:
+            return
+        known = self._known_sections(self._preview_layout, self._shown_language)
+        if self._generation is not None:
+            # Lo que ya llegó de las secciones que se están traduciendo por trozos
+            for (key, target), streamed in self._generation['streamed'].items():
+                if target == self._shown_language and key not in known:
+                    known[key] = streamed
+        with tracer.span('ui.render', language=self._shown_language):
+            self.render_preview_skeleton(self._preview_layout, known)
+        if self._generation is None:
+            # Sin informe en curso, lo que no se tradujo ya no va a llegar
+            for mark in self.preview.mark_names():
+                if mark.startswith('section_') and mark.endswith('_start'):
+                    key = mark[len('section_'):-len('_start')]
+                    if self.preview.get(mark, f"section_{key}_end") == "Traduciendo...":
+                        self.replace_preview_section(key, "[Sin traducir: pulsa Generar]")
+    
+    def render_preview_skeleton(self, layout, known=None):
+        """
+        Escribe el informe con un marcador "Traduciendo..." en cada sección
+        (o su traducción, si ya está en known). Cada sección queda delimitada
+        por las marcas section_<clave>_start/_end para poder sustituir su
+        contenido cuando llegue la traducción.
+        """
+        known = known or {}
+        self.preview.delete('1.0', tk.END)
+        for mark in self.preview.mark_names():
+            if mark.startswith('section_'):
+                self.preview.mark_unset(mark)
+        self._clear_preview_folds()
+        
+        # Configurar tags de formato
+        self.preview.tag_config("verified_word", foreground='#107C10', font=('Consolas', 10, 'bold'))
+        self.preview.tag_config("reopened_word", foreground='#CC0000', font=('Consolas', 10, 'bold'))
+        self.preview.tag_config("console_logs", font=('Consolas', 9), foreground='#006600', background='#f0f0f0')
+        self.preview.tag_config("fold_link", foreground=MaterialColors.PRIMARY, underline=True)
+        
+        for kind, key_or_text, value in layout:
+            if kind == 'section':
+                start, end = f"section_{key_or_text}_start", f"section_{key_or_text}_end"
+                self.preview.mark_set(start, "end-1c")
+                self.preview.mark_gravity(start, tk.LEFT)
+                self.preview.insert(tk.END, known.get(key_or_text, "Traduciendo..."))
+                self.preview.mark_set(end, "end-1c")
+                self.preview.mark_gravity(end, tk.LEFT)
+            elif value == "console_logs":
+                self.insert_preview_block(key_or_text, value)
+            elif value:
+                self.preview.insert(tk.END, key_or_text, value)
             else:
-                self.preview.insert(tk.END, "\n")
-            self.root.update()
-            
-            if rt == "OPENED":
-                self.preview.insert(tk.END, "Traduciendo...\n")
-                self.preview.see(tk.END)
-                self.root.update()
-                
-                summ = translate_and_correct(self.summary.get())
-                self.preview.delete("end-2l", "end-1l")
-                self.preview.insert(tk.END, f"Summary: {summ}\n\n")
-                self.root.update()
-            
-            self.preview.insert(tk.END, "Traduciendo...\n")
-            self.preview.see(tk.END)
-            self.root.update()
-            
-            eq = translate_equipment_info(self.equipment.get('1.0', tk.END).strip())
-            self.preview.delete("end-2l", "end-1l")
-            self.preview.insert(tk.END, "[Equipment information]:\n\n")
-            self.preview.insert(tk.END, f"{eq}\n\n")
-            self.root.update()
-            
-            self.preview.insert(tk.END, "Traduciendo...\n")
-            self.preview.see(tk.END)
-            self.root.update()
-            
-            fault = translate_and_correct(self.description.get('1.0', tk.END).strip())
-            self.preview.delete("end-2l", "end-1l")
-            self.preview.insert(tk.END, "[Fault]:\n")
-            self.preview.insert(tk.END, f"{fault}\n\n")
-            self.root.update()
-            
-            logs = self.console_logs.get('1.0', tk.END).strip()
-            
-            if logs and not logs.startswith("#"):
-                self.preview.insert(tk.END, "[Console Logs]:\n")
-                start_idx = self.preview.index("end-1c")
-                self.preview.insert(tk.END, f"{logs}\n\n")
-                end_idx = self.preview.index("end-1c")
-                
-                self.preview.tag_add("console_logs", start_idx, end_idx)
-                self.root.update()
-            
-            proc = self.procedure.get_numbered_text()
-            if proc.strip() and proc.strip() != "1.":
-                self.preview.insert(tk.END, "Traduciendo...\n")
-                self.preview.see(tk.END)
-                self.root.update()
+                self.preview.insert(tk.END, key_or_text)
+    
+    def insert_preview_block(self, text, tag):
+        """
+        Añade un bloque al final del preview. Si es muy largo solo se escriben
+        las primeras y últimas líneas; el resto queda en memoria tras una línea
+        "⋯ N líneas ocultas" que lo va mostrando a petición.
+        """
+        folded = fold_lines(text)
+        if folded is None:
+            self.preview.insert(tk.END, text, tag)
+            return
+        
+        head, hidden, tail = folded
+        self._fold_serial += 1
+        fold = f"fold_{self._fold_serial}"
+        self._folds[fold] = {'lines': hidden, 'next': 0, 'tag': tag}
+        self.preview.insert(tk.END, head, tag)
+        start = f"{fold}_start"
+        self.preview.mark_set(start, "end-1c")
+        self.preview.mark_gravity(start, tk.LEFT)
+        self.preview.insert(tk.END, "\n", tag)
+        self._write_fold_marker(fold)
+        self.preview.insert(tk.END, tail, tag)
+        
+        for action, count in (('more', PREVIEW_FOLD_PAGE), ('all', None)):
+            link = f"{fold}_{action}"
+            self.preview.tag_bind(link, '<Button-1>',
+                                  lambda event, fold=fold, count=count: self.expand_preview_fold(fold, count))
+            self.preview.tag_bind(link, '<Enter>', lambda event: self.preview.configure(cursor='hand2'))
+            self.preview.tag_bind(link, '<Leave>', lambda event: self.preview.configure(cursor=''))
+    
+    def _write_fold_marker(self, fold):
+        """Reescribe la línea que indica cuántas líneas siguen ocultas en el bloque."""
+        state = self._folds[fold]
+        start = f"{fold}_start"
+        remaining = len(state['lines']) - state['next']
+        tags = (state['tag'], 'fold_link')
+        # La marca se queda al principio de la línea mientras se escribe...
+        self.preview.mark_gravity(start, tk.LEFT)
+        self.preview.delete(start, f"{start} lineend")
+        self.preview.insert(start,
+                            f"    ⋯ {remaining} líneas ocultas · ", state['tag'],
+                            f"mostrar {min(PREVIEW_FOLD_PAGE, remaining)} más", tags + (f"{fold}_more",),
+                            " · ", state['tag'],
+                            "mostrar todo", tags + (f"{fold}_all",))
+        # ...y luego avanza con las líneas que se van mostrando encima
+        self.preview.mark_gravity(start, tk.RIGHT)
+    
+    def expand_preview_fold(self, fold, count=None):
+        """Muestra las siguientes count líneas ocultas de un bloque (todas si es None)."""
+        state = self._folds.get(fold)
+        if state is None:
+            return 'break'
+        
+        lines, first = state['lines'], state['next']
+        last = len(lines) if count is None else min(len(lines), first + count)
+        start = f"{fold}_start"
+        with tracer.span('ui.expand', lines=last - first):
+            self.preview.insert(start, ''.join(lines[first:last]), state['tag'])
+            state['next'] = last
+            if last < len(lines):
+                self._write_fold_marker(fold)
+            else:
+                self.preview.delete(start, f"{start} + 1 lines")
+                self._drop_preview_fold(fold)
+        return 'break'
+    
+    def _drop_preview_fold(self, fold):
+        self.preview.mark_unset(f"{fold}_start")
+        for action in ('more', 'all'):
+            self.preview.tag_delete(f"{fold}_{action}")
+        del self._folds[fold]
+    
+    def _clear_preview_folds(self):
+        for fold in list(self._folds):
+            self._drop_preview_fold(fold)
+    
+    def preview_text(self):
+        """Texto completo del preview, con las líneas ocultas de los bloques plegados."""
+        pieces = []
+        position = '1.0'
+        for fold, state in self._folds.items():
+            start = f"{fold}_start"
+            pieces.append(self.preview.get(position, start))
+            pieces.append(''.join(state['lines'][state['next']:]))
+            position = f"{start} + 1 lines"
+        pieces.append(self.preview.get(position, 'end-1c'))
+        return ''.join(pieces)
+    
+    def replace_preview_section(self, key, text):
+        """Sustituye el contenido de una sección del preview entre sus marcas."""
+        start, end = f"section_{key}_start", f"section_{key}_end"
+        self.preview.delete(start, end)
+        index = self.preview.index(start)
+        # La marca final avanza con el texto insertado y luego vuelve a quedar fija
+        self.preview.mark_set(end, index)
+        self.preview.mark_gravity(end, tk.RIGHT)
+        self.preview.insert(index, text)
+        self.preview.mark_gravity(end, tk.LEFT)
+    
+    def append_preview_section(self, key, text):
+        """Añade texto al final de una sección del preview (traducción por trozos)."""
+        end = f"section_{key}_end"
+        self.preview.mark_gravity(end, tk.RIGHT)
+        self.preview.insert(end, text)
+        self.preview.mark_gravity(end, tk.LEFT)
+    
+    def patch_preview_section(self, key, old, new):
+        """
+        Cambia el texto old de una sección por new tocando solo la parte que
+        difiere (las correcciones gramaticales tras la traducción por trozos).
+        """
+        prefix = len(os.path.commonprefix([old, new]))
+        suffix = len(os.path.commonprefix([old[prefix:][::-1], new[prefix:][::-1]]))
+        if prefix == len(old) == len(new):
+            return
+        start, end = f"section_{key}_start", f"section_{key}_end"
+        first = f"{start} + {prefix} chars"
+        self.preview.mark_gravity(end, tk.RIGHT)
+        self.preview.delete(first, f"{start} + {len(old) - suffix} chars")
+        self.preview.insert(first, new[prefix:len(new) - suffix])
+        self.preview.mark_gravity(end, tk.LEFT)
+    
+    @staticmethod
+    def _generation_worker(sections, results, cancel, streaming=False):
+        """
+        Traduce las secciones en paralelo fuera del hilo de Tk y envía cada
+        resultado a la cola en cuanto termina; la interfaz lo coloca en su sitio.
+        Con streaming también envía cada trozo traducido ('partial').
+        """
+        try:
+            if any(target == 'en' for _, _, target in sections):
+                grammar_tool.health_check()
+            if streaming:
+                for key, target, kind, payload in iter_streamed_sections(sections, cancel):
+                    results.put(('section' if kind == 'final' else 'partial', (key, target), payload))
+            else:
+                for key, target, translated in iter_translated_sections(sections, cancel):
+                    results.put(('section', (key, target), translated))
+        except Exception as e:
+            results.put(('error', None, str(e)))
+            return
+        if not cancel.is_set():
+            results.put(('done', None, None))
+    
+    def _poll_generation(self):
+        generation = self._generation
+        if generation is None:
+            return
+        
+        try:
+            while True:
+                kind, key, payload = generation['queue'].get_nowait()
                 
-                proc_t = translate_and_correct(proc)
-                self.preview.delete("end-2l", "end-1l")
-                self.preview.insert(tk.END, "[Procedure]:\n")
-                self.preview.insert(tk.END, f"{proc_t}\n\n")
-                self.root.update()
-            
-            if rt == "OPENED":
-                exp = self.expected.get('1.0', tk.END).strip()
-                if exp:
-                    self.preview.insert(tk.END, "Traduciendo...\n")
-                    self.preview.see(tk.END)
-                    self.root.update()
-                    
-                    exp_t = translate_and_correct(exp)
-                    self.preview.delete("end-2l", "end-1l")
-                    self.preview.insert(tk.END, "[Expected]:\n")
-                    self.preview.insert(tk.END, f"{exp_t}\n\n")
-                    self.root.update()
-            
-            att = self.attachments.get().strip()
-            if att:
-                self.preview.insert(tk.END, "[Attachments]:\n")
-                self.preview.insert(tk.END, f"{att}\n")
-            
-            messagebox.showinfo("Listo", "Informe generado correctamente")
+                if kind == 'partial':
+                    section, target = key
+                    streamed = generation['streamed'].get(key)
+                    generation['streamed'][key] = (streamed or '') + payload
+                    if target == self._shown_language:
+                        with tracer.span('ui.append', section=section, chars=len(payload)):
+                            if streamed is None:
+                                self.replace_preview_section(section, payload)
+                            else:
+                                self.append_preview_section(section, payload)
+                elif kind == 'section':
+                    section, target = key
+                    streamed = generation['streamed'].pop(key, None)
+                    if target == self._shown_language:
+                        with tracer.span('ui.splice', section=section, chars=len(payload)):
+                            if streamed is None:
+                                self.replace_preview_section(section, payload)
+                            else:
+                                # Solo cambian las correcciones gramaticales
+                                self.patch_preview_section(section, streamed, payload)
+                    self._section_results[key] = (generation['fingerprints'][section], payload)
+                    generation['done'] += 1
+                    self.progress_bar.configure(value=generation['done'])
+                    self.progress_label.config(
+                        text=f"Traduciendo {generation['done']}/{generation['total']} secciones...")
+                elif kind == 'error':
+                    self._finish_generation('error')
+                    messagebox.showerror("Error", payload)
+                    return
+                elif kind == 'done':
+                    self._finish_generation('ok')
+                    message = "Informe generado correctamente"
+                    savings = format_language_savings()
+                    if savings:
+                        message += f"\n\n{savings}"
+                    messagebox.showinfo("Listo", message)
+                    return
+        except queue.Empty:
+            pass
+        
+        self.root.after(GENERATION_POLL_MS, self._poll_generation)
+    
+    def _finish_generation(self, result):
+        generation = self._generation
+        self._generation = None
+        self.progress_frame.pack_forget()
+        tracer.add_span('generate', generation['started'], time.perf_counter(),
+                        report_type=generation['report_type'],
+                        sections=generation['total'], result=result)
+        if self._diagnostics is not None and self._diagnostics.winfo_exists():
+            self.refresh_diagnostics()
+    
+    def cancel_generation(self):
+        """Cancela el informe en curso; las traducciones que lleguen después se descartan."""
+        generation = self._generation
+        if generation is None:
+            return
+        
+        generation['cancel'].set()
+        self._finish_generation('cancelado')
+        
+        for mark in self.preview.mark_names():
+            if mark.startswith('section_') and mark.endswith('_start'):
+                key = mark[len('section_'):-len('_start')]
+                if self.preview.get(mark, f"section_{key}_end") == "Traduciendo...":
+                    self.replace_preview_section(key, "[Traducción cancelada]")
+                elif (key, self._shown_language) in generation['streamed']:
+                    self.append_preview_section(key, "\n[Traducción cancelada]")
+    
+    def open_diagnostics(self):
+        """Panel con los tiempos por etapa del último informe y exportación de la traza."""
+        if self._diagnostics is not None and self._diagnostics.winfo_exists():
+            self._diagnostics.lift()
+            self.refresh_diagnostics()
+            return
         
+        window = tk.Toplevel(self.root)
+        window.title("Diagnóstico del último informe")
+        window.geometry("680x480")
+        window.configure(bg='white')
+        self._diagnostics = window
+        
+        tree_frame = tk.Frame(window, bg='white')
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(15, 5))
+        
+        self.diagnostics_tree = ttk.Treeview(tree_frame, columns=('calls', 'total', 'max'),
+                                             show='tree headings')
+        self.diagnostics_tree.heading('#0', text="Etapa")
+        self.diagnostics_tree.heading('calls', text="Llamadas")
+        self.diagnostics_tree.heading('total', text="Total (ms)")
+        self.diagnostics_tree.heading('max', text="Máx (ms)")
+        self.diagnostics_tree.column('#0', width=260)
+        for column in ('calls', 'total', 'max'):
+            self.diagnostics_tree.column(column, width=110, anchor='e')
+        tree_scroll = ModernScrollbar(tree_frame, orient="vertical",
+                                      command=self.diagnostics_tree.yview)
+        self.diagnostics_tree.configure(yscrollcommand=tree_scroll.set)
+        self.diagnostics_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.diagnostics_counters = tk.Label(window, text="", font=('Consolas', 9), bg='white',
+                                             fg=MaterialColors.TEXT_SECONDARY,
+                                             justify=tk.LEFT, anchor='w')
+        self.diagnostics_counters.pack(fill=tk.X, padx=15)
+        
+        btns = tk.Frame(window, bg='white')
+        btns.pack(fill=tk.X, padx=15, pady=15)
+        RoundedButton(btns, text="Actualizar", command=self.refresh_diagnostics,
+                      bg_color=MaterialColors.TEXT_SECONDARY, hover_color='#525252',
+                      width=110, height=36).pack(side=tk.LEFT, padx=(0, 5))
+        RoundedButton(btns, text="Exportar JSON",
+                      command=lambda: self.export_trace('json'),
+                      bg_color=MaterialColors.PRIMARY, hover_color=MaterialColors.PRIMARY_HOVER,
+                      width=140, height=36).pack(side=tk.LEFT, padx=5)
+        RoundedButton(btns, text="Exportar Chrome trace",
+                      command=lambda: self.export_trace('chrome'),
+                      bg_color=MaterialColors.PRIMARY, hover_color=MaterialColors.PRIMARY_HOVER,
+                      width=190, height=36).pack(side=tk.LEFT, padx=5)
+        
+        self.refresh_diagnostics()
+    
+    def refresh_diagnostics(self):
+        tree = self.diagnostics_tree
+        tree.delete(*tree.get_children())
+        for name, calls, total, longest in tracer.summary():
+            tree.insert('', tk.END, text=name,
+                        values=(calls, f"{total * 1000:.1f}", f"{longest * 1000:.1f}"))
+        
+        counters = tracer.counters()
+        lines = [
+            "Contadores: " + (', '.join(f"{k}={v}" for k, v in sorted(counters.items())) or "-"),
+            f"Caché traducciones: {translation_cache.stats()}",
+            f"Caché gramática: {grammar_cache.stats()}",
+            f"Limitador: {rate_limiter.stats()}",
+        ]
+        self.diagnostics_counters.config(text='\n'.join(lines))
+    
+    def export_trace(self, fmt):
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        suffix = 'trace' if fmt == 'chrome' else 'diagnostics'
+        path = filedialog.asksaveasfilename(
+            parent=self._diagnostics,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile=f"ReportMaker_{suffix}_{ts}.json"
+        )
+        if not path:
+            return
+        try:
+            if fmt == 'chrome':
+                tracer.export_chrome_trace(path)
+            else:
+                tracer.export_json(path)
+            messagebox.showinfo("Exportado", f"Traza guardada en:\n{path}", parent=self._diagnostics)
         except Exception as e:
-            messagebox.showerror("Error", str(e))
+            messagebox.showerror("Error", str(e), parent=self._diagnostics)
 
-if __name__ == "__main__":
+# ========== MODO SIN INTERFAZ (CLI) ==========
+
+REPORT_INPUT_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+
+def load_report_input(path):
+    """
+    Lee los datos de un informe desde JSON o YAML ('-' para stdin).
+    Devuelve (tipo_de_reparo, fields).
+    """
+    if path == '-':
+        raw = sys.stdin.read()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+    
+    if path.lower().endswith(('.yaml', '.yml')):
+        data = _parse_yaml(raw)
+    else:
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            if path != '-':
+                raise
+            data = _parse_yaml(raw)
+    
+    if not isinstance(data, dict):
+        raise ValueError("La entrada debe ser un objeto con los campos del informe")
+    
+    def field(name):
+        value = data.get(name) or ''
+        if isinstance(value, (list, tuple)):
+            value = '\n'.join(str(item) for item in value)
+        return str(value).strip()
+    
+    report_type = (data.get('type') or data.get('report_type') or 'OPENED').strip().upper()
+    logs = field('logs')
+    fields = {
+        'summary': field('summary'),
+        'equipment': field('equipment'),
+        'description': field('description'),
+        'logs': '' if logs == LOGS_PLACEHOLDER else logs,
+        'procedure': number_steps(field('procedure')),
+        'expected': field('expected'),
+        'attachments': field('attachments'),
+    }
+    
+    log_file = field('log_file')
+    if log_file:
+        # Relativo a la carpeta del fichero de entrada
+        if path != '-' and not os.path.isabs(log_file):
+            log_file = os.path.join(os.path.dirname(os.path.abspath(path)), log_file)
+        levels = data.get('log_levels') or None
+        if isinstance(levels, str):
+            levels = [level for level in re.split(r'[,\s]+', levels) if level]
+        excerpt, _ = read_log_excerpt(log_file,
+                                      head=int(data.get('log_head', LOG_HEAD_LINES)),
+                                      tail=int(data.get('log_tail', LOG_TAIL_LINES)),
+                                      levels=levels, pattern=field('log_filter') or None)
+        fields['logs'] = '\n\n'.join(part for part in (fields['logs'], excerpt) if part)
+        fields['attachments'] = add_attachment(fields['attachments'], os.path.basename(log_file))
+    return report_type, fields
+
+
+def _parse_yaml(raw):
+    try:
+        import yaml
+    except ImportError:
+        raise RuntimeError("Para leer YAML instala PyYAML (pip install pyyaml)")
+    return yaml.safe_load(raw)
+
+
+def language_path(path, target, targets):
+    """Con varios idiomas, cada uno va a su fichero: informe.txt -> informe.fr.txt."""
+    if not path or path == '-' or len(targets) == 1:
+        return path
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{target}{ext}"
+
+
+def run_headless(input_path, output_path=None, docx_path=None, targets=('en',), stdout=None):
+    """
+    Genera un informe desde un fichero de entrada y lo escribe en texto y/o
+    .docx, en cada uno de los idiomas de targets. Devuelve {idioma: texto}.
+    Sin fichero de salida el informe va a stdout (por defecto sys.stdout).
+    """
+    stdout = stdout or sys.stdout
+    report_type, fields = load_report_input(input_path)
+    
+    error = validate_report_fields(report_type, fields)
+    if error:
+        raise ValueError(error)
+    
+    with collect_language_savings() as counters:
+        contents = generate_report_texts(report_type, fields, targets)
+    savings = format_language_savings(counters)
+    if savings:
+        # En modo batch los informes terminan mezclados: se indica de cuál es
+        source = '' if input_path == '-' else f"{os.path.basename(input_path)}: "
+        print(f"🌐 {source}{savings}", file=sys.stderr)
+    
+    for target, content in contents.items():
+        if output_path == '-' or (output_path is None and docx_path is None):
+            if len(targets) > 1:
+                stdout.write(f"===== {target} =====\n")
+            stdout.write(content)
+        elif output_path:
+            with open(language_path(output_path, target, targets), 'w', encoding='utf-8') as f:
+                f.write(content)
+        
+        if docx_path:
+            with tracer.span('export_word.build', chars=len(content)):
+                doc = build_word_document(content.strip())
+            with tracer.span('export_word.save'):
+                doc.save(language_path(docx_path, target, targets))
+    
+    return contents
+
+
+def run_batch(input_dir, output_dir, formats=('txt',), workers=2, skip_existing=False,
+              targets=('en',)):
+    """
+    Procesa todos los .json/.yaml de input_dir con un pool de workers.
+    Devuelve el número de informes que fallaron.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    inputs = sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(REPORT_INPUT_EXTENSIONS))
+    
+    def process(path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        txt_path = os.path.join(output_dir, f"{stem}.txt") if 'txt' in formats else None
+        docx_path = os.path.join(output_dir, f"{stem}.docx") if 'docx' in formats else None
+        outputs = [language_path(p, target, targets)
+                   for p in (txt_path, docx_path) if p for target in targets]
+        
+        if skip_existing and all(os.path.exists(p) for p in outputs):
+            return path, None, True
+        try:
+            run_headless(path, txt_path, docx_path, targets)
+            return path, None, False
+        except Exception as e:
+            return path, e, False
+    
+    print(f"📂 {len(inputs)} informes en {input_dir} ({workers} workers)")
+    failures = 0
+    start = time.time()
+    
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for i, (path, error, skipped) in enumerate(executor.map(process, inputs), 1):
+            name = os.path.basename(path)
+            if error:
+                failures += 1
+                print(f"❌ [{i}/{len(inputs)}] {name}: {error}")
+            elif skipped:
+                print(f"⏭️ [{i}/{len(inputs)}] {name}: ya generado")
+            else:
+                print(f"✅ [{i}/{len(inputs)}] {name}")
+    
+    print(f"🏁 {len(inputs) - failures}/{len(inputs)} informes en {time.time() - start:.1f} s")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="ReportMaker: sin argumentos abre la interfaz gráfica; "
+                    "con --input o --batch genera informes sin interfaz.")
+    parser.add_argument('--input', '-i', metavar='FICHERO',
+                        help="JSON/YAML con los datos del informe ('-' para stdin)")
+    parser.add_argument('--output', '-o', metavar='FICHERO',
+                        help="Fichero de texto de salida ('-' para stdout)")
+    parser.add_argument('--docx', metavar='FICHERO', help="Exportar también a Word")
+    parser.add_argument('--batch', metavar='CARPETA',
+                        help="Procesar todos los .json/.yaml de una carpeta")
+    parser.add_argument('--out-dir', metavar='CARPETA', default='reports',
+                        help="Carpeta de salida del modo batch (por defecto: reports)")
+    parser.add_argument('--format', choices=['txt', 'docx', 'both'], default='txt',
+                        help="Formato de salida del modo batch")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Informes en paralelo en modo batch")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="En modo batch, saltar informes ya generados")
+    parser.add_argument('--languages', '-l', metavar='IDIOMAS', default='en',
+                        help="Idiomas de destino separados por comas "
+                             f"({', '.join(LANGUAGES)}); por defecto en. Con varios, cada "
+                             "salida lleva el idioma en el nombre (informe.fr.txt)")
+    parser.add_argument('--backend', metavar='MOTORES',
+                        help="Motores de traducción en orden de preferencia, separados por comas "
+                             f"({', '.join(TRANSLATION_BACKENDS)}); por defecto REPORTMAKER_BACKENDS o google")
+    parser.add_argument('--trace', metavar='FICHERO',
+                        help="Guardar la traza de tiempos (formato Chrome trace) al terminar")
+    parser.add_argument('--no-warmup', action='store_true',
+                        help="No precargar dependencias al abrir la ventana (carga solo al usarlas)")
+    parser.add_argument('--startup-report', nargs='?', const='-', metavar='FICHERO',
+                        help="Mostrar (o guardar en FICHERO) los tiempos de arranque e importación")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.backend:
+        try:
+            configure_translation_backends(args.backend)
+        except ValueError as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            return 2
+    
+    try:
+        targets = parse_languages(args.languages)
+    except ValueError as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        return 2
+    
+    # Sin interfaz, stdout queda solo para el informe (para poder redirigirlo o
+    # encadenarlo); los avisos de traducción, reintentos y corrector van a stderr
+    report_stdout = sys.stdout
+    
+    if args.batch:
+        formats = ('txt', 'docx') if args.format == 'both' else (args.format,)
+        with redirect_stdout(sys.stderr):
+            failures = run_batch(args.batch, args.out_dir, formats, args.workers,
+                                 args.skip_existing, targets)
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+        return 1 if failures else 0
+    
+    if args.input:
+        try:
+            with redirect_stdout(sys.stderr):
+                run_headless(args.input, args.output, args.docx, targets, stdout=report_stdout)
+        except Exception as e:
+            print(f"❌ Error: {e}", file=sys.stderr)
+            return 1
+        finally:
+            if args.trace:
+                tracer.export_chrome_trace(args.trace)
+        return 0
+    
     root = tk.Tk()
     app = RepairReportGenerator(root)
-    root.mainloop()
\ No newline at end of file
+    mark_startup('ventana creada')
+    
+    def on_window_ready():
+        root.update_idletasks()
+        mark_startup('primera ventana')
+        report = None
+        if args.startup_report:
+            report = lambda: write_startup_report(args.startup_report)
+        if args.no_warmup:
+            if report:
+                report()
+        else:
+            warm_up_in_background(on_done=report)
+    
+    root.after(1, on_window_ready)
+    root.mainloop()
+    return 0
+
+
+mark_startup('módulo cargado')
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file